@@ -0,0 +1,145 @@
+"""
+Registry of standard named curves (SEC 2, FIPS 186-4, RFC 7748).
+The parameters are known, so the order of the generator and the cofactor are
+set on the Curve instead of being computed, and the fixed-base table of the
+generator is only built the first time it is used.
+"""
+from utils import factorint
+from weierstrass import Curve, Point, fixed_base
+from montgomery import CURVE25519, CURVE25519_BASE
+
+
+class NamedCurve:
+    """
+    Standard curve y^2 = x^3 + ax + b mod p with a generator G of prime order n.
+    @param name: Name of the curve.
+    @param p, a, b: Curve parameters.
+    @param gx, gy: Coordinates of the generator.
+    @param n: Order of the generator.
+    @param h: Cofactor, #E = h * n.
+    @param montgomery: MontgomeryCurve, when the curve is defined in Montgomery form.
+    """
+
+    def __init__(self, name: str, p: int, a: int, b: int, gx: int, gy: int, n: int, h: int = 1, aliases=(), montgomery=None):
+        self.name = name
+        self.p, self.a, self.b = p, a, b
+        self.gx, self.gy = gx, gy
+        self.n, self.h = n, h
+        self.aliases = aliases
+        self.montgomery = montgomery
+        self._curve = None
+
+    @property
+    def curve(self) -> Curve:
+        if self._curve is None:
+            self._curve = Curve(self.a, self.b, self.p)
+            factors = factorint(self.h)
+            factors[self.n] = factors.get(self.n, 0) + 1
+            self._curve.set_cardinality(self.h * self.n, factors)
+        return self._curve
+
+    @property
+    def G(self) -> Point:
+        return Point.unchecked(self.gx, self.gy, self.curve)
+
+    @property
+    def table(self):
+        """Fixed-base table of G, built on first use and cached."""
+        return fixed_base(self.G)
+
+    def __str__(self):
+        return f"{self.name}: y^2 = x^3 + {self.a}x + {self.b} [{self.p}], n = {self.n}, h = {self.h}"
+
+
+_a, _b, _gx, _gy = CURVE25519.to_weierstrass(*CURVE25519_BASE)
+
+_CURVES = [
+    NamedCurve(
+        "secp256k1",
+        p=2**256 - 2**32 - 977,
+        a=0,
+        b=7,
+        gx=0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+        gy=0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8,
+        n=0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141,
+    ),
+    NamedCurve(
+        "P-256",
+        p=2**256 - 2**224 + 2**192 + 2**96 - 1,
+        a=-3,
+        b=0x5AC635D8AA3A93E7B3EBBD55769886BC651D06B0CC53B0F63BCE3C3E27D2604B,
+        gx=0x6B17D1F2E12C4247F8BCE6E563A440F277037D812DEB33A0F4A13945D898C296,
+        gy=0x4FE342E2FE1A7F9B8EE7EB4A7C0F9E162BCE33576B315ECECBB6406837BF51F5,
+        n=0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551,
+        aliases=("secp256r1", "prime256v1"),
+    ),
+    NamedCurve(
+        "P-384",
+        p=2**384 - 2**128 - 2**96 + 2**32 - 1,
+        a=-3,
+        b=0xB3312FA7E23EE7E4988E056BE3F82D19181D9C6EFE8141120314088F5013875AC656398D8A2ED19D2A85C8EDD3EC2AEF,
+        gx=0xAA87CA22BE8B05378EB1C71EF320AD746E1D3B628BA79B9859F741E082542A385502F25DBF55296C3A545E3872760AB7,
+        gy=0x3617DE4A96262C6F5D9E98BF9292DC29F8F41DBD289A147CE9DA3113B5F0B8C00A60B1CE1D7E819D7A431D7C90EA0E5F,
+        n=0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFC7634D81F4372DDF581A0DB248B0A77AECEC196ACCC52973,
+        aliases=("secp384r1",),
+    ),
+    NamedCurve(
+        "P-521",
+        p=2**521 - 1,
+        a=-3,
+        b=0x0051953EB9618E1C9A1F929A21A0B68540EEA2DA725B99B315F3B8B489918EF109E156193951EC7E937B1652C0BD3BB1BF073573DF883D2C34F1EF451FD46B503F00,
+        gx=0x00C6858E06B70404E9CD9E3ECB662395B4429C648139053FB521F828AF606B4D3DBAA14B5E77EFE75928FE1DC127A2FFA8DE3348B3C1856A429BF97E7E31C2E5BD66,
+        gy=0x011839296A789A3BC0045C8A5FB42C7D1BD998F54449579B446817AFBD17273E662C97EE72995EF42640C550B9013FAD0761353C7086A272C24088BE94769FD16650,
+        n=0x01FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFA51868783BF2F966B7FCC0148F709A5D03BB5C9B8899C47AEBB6FB71E91386409,
+        aliases=("secp521r1",),
+    ),
+    # Curve25519 v^2 = u^3 + 486662u^2 + u, base point u = 9, in short Weierstrass form
+    NamedCurve(
+        "Curve25519",
+        p=CURVE25519.p,
+        a=_a,
+        b=_b,
+        gx=_gx,
+        gy=_gy,
+        n=2**252 + 27742317777372353535851937790883648493,
+        h=8,
+        aliases=("X25519",),
+        montgomery=CURVE25519,
+    ),
+]
+
+CURVES = {}
+for _named in _CURVES:
+    for _name in (_named.name,) + _named.aliases:
+        CURVES[_name.lower()] = _named
+
+
+def get_curve(name: str) -> NamedCurve:
+    """
+    @param name: Name of the curve, case insensitive ("P-256", "secp256r1", "secp256k1"...).
+    @return: NamedCurve
+    """
+    try:
+        return CURVES[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown curve {name}, available: {sorted({c.name for c in _CURVES})}")
+
+
+if __name__ == "__main__":
+    from time import perf_counter
+    from ecdlp import EC_Key, ECDSA
+
+    for named in _CURVES:
+        curve, G = named.curve, named.G
+        assert curve.onCuve(G.x, G.y)
+        assert G * named.n == curve.infinity
+        assert G.get_order_point() == named.n
+        print(named.name, "ok")
+
+    named = get_curve("secp256r1")
+    start = perf_counter()
+    key = EC_Key(named.curve, named.G, 0xC9AFA9D845BA75166B5C215767B1D6934E50C3DB36E89B127B8A622B120F6721)
+    dsa = ECDSA(named.curve)
+    sig = dsa.sign(named.G, named.n, key.privKey(), 20)
+    assert dsa.verify(named.G, named.n, key.Q, sig, 20)
+    print(f"P-256 key and signature in {perf_counter() - start:.3f} s")
@@ -0,0 +1,173 @@
+"""
+Elliptic Curve Discrete Logarithm Problem solver: find l such that Q = l * P.
+
+- Pohlig-Hellman reduces the problem to the subgroups of prime order q dividing ord(P),
+  one digit of l in base q at a time.
+- Each prime order subgroup is solved by exhaustive search for small q, otherwise by
+  Pollard's rho with an r-adding walk and distinguished points: the walks are independent,
+  so they are spread over a process pool and only the distinguished points are sent back.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from random import Random, randrange
+
+from sympy.ntheory.modular import crt
+
+from utils import factorint
+from weierstrass import Point
+
+SMALL_ORDER = 1 << 10
+PARTITIONS = 20
+WALKS_PER_TASK = 8
+
+
+def _rho_walks(P: Point, Q: Point, n: int, table, mask: int, walks: int, max_steps: int, seed: int):
+    """
+    Runs `walks` random walks X = cP + dQ, X <- X + R[x mod r], until X is distinguished (x & mask == 0).
+    Walks longer than max_steps (cycles) or reaching the infinity point are dropped.
+    @return: list of distinguished points (x, y, c, d).
+    """
+    rng = Random(seed)
+    p = P.curve.p
+    O = P.curve.infinity
+    r = len(table)
+    found = []
+
+    for _ in range(walks):
+        c, d = rng.randrange(n), rng.randrange(n)
+        X = P * c + Q * d
+        if X == O:
+            continue
+
+        x, y = X.x, X.y
+        for _ in range(max_steps):
+            if x & mask == 0:
+                found.append((x, y, c % n, d % n))
+                break
+
+            rx, ry, rc, rd = table[x % r]
+            if x == rx:
+                break
+            m = (ry - y) * pow(rx - x, -1, p) % p
+            x3 = (m * m - x - rx) % p
+            y = (m * (x - x3) - y) % p
+            x = x3
+            c += rc
+            d += rd
+    return found
+
+
+def pollard_rho(P: Point, Q: Point, n: int, workers: int = 1, distinguished_bits: int = None):
+    """
+    Discrete logarithm of Q in base P, P of prime order n.
+    @param workers: Number of processes running walks (1: in the current process).
+    @param distinguished_bits: x is distinguished when its low bits are 0, 1 point every 2^bits steps.
+    @return: l such that Q = l * P
+    """
+    O = P.curve.infinity
+    if Q == O:
+        return 0
+
+    # Partition steps R_j = c_j P + d_j Q
+    table = []
+    while len(table) < PARTITIONS:
+        c, d = randrange(n), randrange(n)
+        R = P * c + Q * d
+        if R != O:
+            table.append((R.x, R.y, c, d))
+
+    if distinguished_bits is None:
+        distinguished_bits = max(0, n.bit_length() // 4 - 2)
+    mask = (1 << distinguished_bits) - 1
+    max_steps = 20 << distinguished_bits
+    args = (P, Q, n, table, mask, WALKS_PER_TASK, max_steps)
+
+    seen = {}
+
+    def collision(points):
+        for x, y, c, d in points:
+            if (x, y) not in seen:
+                seen[(x, y)] = (c, d)
+                continue
+            c2, d2 = seen[(x, y)]
+            # cP + dQ = c2 P + d2 Q  =>  l = (c - c2) / (d2 - d)
+            if (d2 - d) % n:
+                return (c - c2) * pow(d2 - d, -1, n) % n
+
+    if workers == 1:
+        while True:
+            l = collision(_rho_walks(*args, randrange(1 << 64)))
+            if l is not None:
+                return l
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_rho_walks, *args, randrange(1 << 64)) for _ in range(2 * workers)}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                l = collision(future.result())
+                if l is not None:
+                    for other in pending:
+                        other.cancel()
+                    return l
+                pending.add(pool.submit(_rho_walks, *args, randrange(1 << 64)))
+
+
+def _exhaustive(P: Point, Q: Point, n: int):
+    R = P.curve.infinity
+    for l in range(n):
+        if R == Q:
+            return l
+        R += P
+    raise ValueError("Q is not a multiple of P")
+
+
+def discrete_log(P: Point, Q: Point, n: int = None, workers: int = None):
+    """
+    Pohlig-Hellman: l is computed modulo every prime power q^e of n = ord(P), then recombined (CRT).
+    @param P: Base point.
+    @param Q: Point of the subgroup generated by P.
+    @param n: Order of P, computed from the curve cardinality if not given.
+    @param workers: Processes used by Pollard's rho (default: all the cores).
+    @return: l such that Q = l * P
+    """
+    n = n or P.get_order_point()
+    workers = workers or os.cpu_count()
+    moduli, residues = [], []
+
+    for q, e in factorint(n).items():
+        # P_q has order q, the digits of l mod q^e are found one at a time
+        P_q = P * (n // q)
+        l = 0
+        for k in range(e):
+            h = (Q - P * l) * (n // q ** (k + 1))
+            if h * q != P.curve.infinity:
+                raise ValueError("Q is not a multiple of P")
+            if q < SMALL_ORDER:
+                digit = _exhaustive(P_q, h, q)
+            else:
+                digit = pollard_rho(P_q, h, q, workers=workers if q.bit_length() > 32 else 1)
+            l += digit * q**k
+        moduli.append(q**e)
+        residues.append(l)
+
+    l = int(crt(moduli, residues)[0])
+    if P * l != Q:
+        raise ValueError("Q is not a multiple of P")
+    return l
+
+
+if __name__ == "__main__":
+    from weierstrass import Curve
+
+    a, b, p = -3, 1, 1217
+    curve = Curve(a, b, p)
+    P = Point(743, 473, a, b, p)
+    Q = 83 * P
+    print(f"Q = {Q} = {discrete_log(P, Q)} * {P}")
+
+    # 40-bit prime order subgroup, Pollard's rho over the process pool
+    curve = Curve(5, 7, 1099511627791)
+    n, G = curve.get_prime_order()
+    l = randrange(n)
+    print(f"n = {n}, l = {l}, found = {discrete_log(G, l * G, n)}")
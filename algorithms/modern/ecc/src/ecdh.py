@@ -1,5 +1,5 @@
-from utils import randint, np
-from WeierstrassEC import Point, Curve
+from utils import randint, np, batch_invert
+from weierstrass import Point, Curve, INF, JacobianPoint, fixed_base
 
 
 def dh(nA: int, nB: int, P: Point) -> str:
@@ -31,6 +31,64 @@ def dh(nA: int, nB: int, P: Point) -> str:
         print("Key agreement failed.\n")
 
 
+class ECDHContext:
+    """
+    Key agreement state of a server handling many sessions.
+    The table of the base point is built once, the shared secrets of a batch of peers
+    are converted back to affine coordinates with a single inversion.
+    @param G: Base point.
+    @param n: Order of G.
+    @param private_key: Secret key, drawn at random if not given.
+    @param cofactor: #E / n if known. With a cofactor of 1 every point of the curve is in the
+    subgroup of G and the check n * Q = O is skipped, otherwise it is done for every peer.
+    """
+
+    def __init__(self, G: Point, n: int, private_key: int = None, cofactor: int = None):
+        self.G = G
+        self.n = n
+        self.cofactor = cofactor
+        self.curve = G.curve
+        self.table = fixed_base(G)
+        self.private_key = private_key or randint(1, n - 1)
+        self.public_key = self.table * self.private_key
+        # Size of the shared secrets in bytes
+        self.size = (self.curve.p.bit_length() + 7) // 8
+
+    def shared_secret(self, peer: Point) -> bytes:
+        return self.shared_secrets([peer])[0]
+
+    def valid_peer(self, Q: Point) -> bool:
+        """
+        Public key validation: on the curve of G, not the infinity point, and in the subgroup of G.
+        A point of another curve (invalid-curve attack) or of small order would leak the
+        private key modulo its order.
+        """
+        if Q.curve is not self.curve or Q.x == INF or not self.curve.onCuve(Q.x, Q.y):
+            return False
+        return self.cofactor == 1 or (JacobianPoint.from_affine(Q) * self.n).is_infinity()
+
+    def shared_secrets(self, peers) -> list:
+        """
+        Shared secrets with a batch of peers: x-coordinate of private_key * Q, big endian.
+        The inverses of the Z-coordinates are computed together (Montgomery's trick).
+        @param peers: Public keys of the peers.
+        @return: list of bytes, None for the keys which fail valid_peer or give the infinity point.
+        """
+        curve, d = self.curve, self.private_key
+        points = [JacobianPoint.from_affine(Q) * d if self.valid_peer(Q) else None for Q in peers]
+        p = curve.p
+        z_inv = iter(batch_invert([J.Z for J in points if J is not None and J.Z != 0], p))
+
+        secrets = []
+        for J in points:
+            if J is None or J.Z == 0:
+                secrets.append(None)
+            else:
+                z = next(z_inv)
+                secrets.append((J.X * z * z % p).to_bytes(self.size, "big"))
+        return secrets
+
+
 if __name__ == "__main__":
     a, b, p = -3, 1, 1217
     curve = Curve(a, b, p)
@@ -42,3 +100,26 @@ if __name__ == "__main__":
         nA, nB = randint(1, 10), randint(1, 10)
         dh(nA, nB, P)
         print("--------------------------------------------------")
+
+    # Server side: one context, many peers
+    from curves import get_curve
+    from time import perf_counter
+
+    named = get_curve("P-256")
+    server = ECDHContext(named.G, named.n, cofactor=named.h)
+    clients = [ECDHContext(named.G, named.n, cofactor=named.h) for _ in range(100)]
+
+    start = perf_counter()
+    secrets = server.shared_secrets([client.public_key for client in clients])
+    elapsed = perf_counter() - start
+    assert all(s == client.shared_secret(server.public_key) for s, client in zip(secrets, clients))
+    print(f"{len(clients)} P-256 shared secrets in {elapsed:.3f} s")
+
+    # Curve25519 has cofactor 8: a point of small order is rejected
+    named = get_curve("Curve25519")
+    server = ECDHContext(named.G, named.n)
+    small = named.curve.random_point() * named.n
+    while small == named.curve.infinity:
+        small = named.curve.random_point() * named.n
+    assert server.shared_secrets([small, clients[0].public_key]) == [None, None]
+    assert server.shared_secret(ECDHContext(named.G, named.n).public_key) is not None
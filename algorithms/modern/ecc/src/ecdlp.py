@@ -1,5 +1,15 @@
-from utils import isInvertable, randint, invert, randint
-from weierstrass import Curve, Point, INF
+import hashlib
+import hmac
+
+from utils import randint, invert, batch_invert
+from weierstrass import Curve, Point, INF, JacobianPoint, fixed_base, multi_scalar_mul
+
+# Hash function of the HMAC-DRBG generating the ECDSA nonces
+NONCE_HASH = hashlib.sha256
+
+# Window widths of the odd multiples tables kept by ECDSA.verify_batch
+BASE_WIDTH = 6
+KEY_WIDTH = 5
 
 
 class EC_Key:
@@ -13,7 +23,8 @@ class EC_Key:
     def __init__(self, curve: Curve, P: Point, l: int):
         self.curve = curve
         self.P = P
-        self.Q = l * P
+        self.P_table = fixed_base(P)
+        self.Q = self.P_table * l
         self.l = l
 
     def pubKey(self):
@@ -57,7 +68,7 @@ class Elgamal:
         """
         p = curve.p
         k = randint(1, p - 2)
-        C1 = k * P
+        C1 = fixed_base(P) * k
         C2 = M + k * Q
         return [C1, C2]
 
@@ -70,14 +81,57 @@ class Elgamal:
         return C2 - l * C1
 
 
+def rfc6979_nonces(s: int, h: int, n: int, hashfunc=NONCE_HASH):
+    """
+    Deterministic ECDSA nonces (RFC 6979 section 3.2): HMAC-DRBG seeded with the private key and the hash.
+    @param s : Private key.
+    @param h : Hash of the message, as an integer.
+    @param n : Order of the base point.
+    @return: generator of the candidates k in [1, n - 1], in order.
+    """
+    qlen = n.bit_length()
+    rlen = (qlen + 7) // 8
+
+    def bits2int(data):
+        v = int.from_bytes(data, "big")
+        return v >> max(0, 8 * len(data) - qlen)
+
+    mac = lambda key, data: hmac.new(key, data, hashfunc).digest()
+    seed = s.to_bytes(rlen, "big") + (h % n).to_bytes(rlen, "big")
+
+    V = b"\x01" * hashfunc().digest_size
+    K = b"\x00" * hashfunc().digest_size
+    K = mac(K, V + b"\x00" + seed)
+    V = mac(K, V)
+    K = mac(K, V + b"\x01" + seed)
+    V = mac(K, V)
+
+    while True:
+        T = b""
+        while len(T) < rlen:
+            V = mac(K, V)
+            T += V
+        k = bits2int(T[:rlen])
+        if 0 < k < n:
+            yield k
+        K = mac(K, V + b"\x00")
+        V = mac(K, V)
+
+
 class ECDSA:
     """
     Elliptic Curve Digital Signature Algorithm.\n
     @param key: Elliptic Curve Cryptography Key.
+    @param hashfunc: Hash function of the RFC 6979 nonce generator.
     """
 
-    def __init__(self, curve: Curve):
+    def __init__(self, curve: Curve, hashfunc=NONCE_HASH):
         self.curve = curve
+        self.hashfunc = hashfunc
+        # Odd multiples of the base points, and of the public keys which passed the
+        # subgroup check (None for the rejected keys)
+        self._bases = {}
+        self._keys = {}
 
     def sign(self, G: Point, n: int, s: int, m: int):
         """
@@ -86,24 +140,45 @@ class ECDSA:
         @param s : Private key.
         @param m : Message to sign.
         """
-        k = randint(1, n - 1)
-        kG = k * G
-        x = pow(kG.x, 1, n)
-
-        if x == 0:
-            return self.sign(G, n, s, m)
+        return self._sign(fixed_base(G), n, s, m)
 
-        try:
-            if isInvertable(k, n):
-                k_inv = invert(k, n)
-                y = pow(k_inv * (m + s * x), 1, n)
-                if y == 0:
-                    return self.sign(G, n, s, m)
+    def sign_many(self, G: Point, n: int, s: int, messages) -> list[dict]:
+        """
+        Sign many messages with the same key, the table of multiples of G is built once.
+        @param messages : Iterable of messages.
+        @return: list of signatures
+        """
+        table = fixed_base(G)
+        return [self._sign(table, n, s, m) for m in messages]
+
+    def _sign(self, table, n: int, s: int, m: int):
+        # k is the first RFC 6979 nonce giving non-zero x and y, n being prime every k is invertible
+        for k in rfc6979_nonces(s, m, n, self.hashfunc):
+            x = pow((table * k).x, 1, n)
+            if x == 0:
+                continue
+
+            y = pow(invert(k, n) * (m + s * x), 1, n)
+            if y != 0:
                 return {"x": x, "y": y}
-            else:
-                return self.sign(G, n, s, m)
-        except ValueError:
-            return self.sign(G, n, s, m)
+
+    def _base_table(self, G: Point):
+        key = (G.x, G.y, G.curve)
+        if key not in self._bases:
+            self._bases[key] = JacobianPoint.from_affine(G).odd_multiples(BASE_WIDTH)
+        return self._bases[key]
+
+    def _key_table(self, Q: Point, n: int):
+        """
+        Public key validation (on the curve, not ∞, nQ = ∞), done once per key and order:
+        the subgroup check depends on n, so the result is cached under (Q, n).
+        """
+        key = (Q.x, Q.y, Q.curve, n)
+        if key not in self._keys:
+            O = self.curve.infinity
+            valid = Q.curve is self.curve and Q != O and self.curve.onCuve(Q.x, Q.y) and n * Q == O
+            self._keys[key] = JacobianPoint.from_affine(Q).odd_multiples(KEY_WIDTH) if valid else None
+        return self._keys[key]
 
     def verify(self, G: Point, n: int, Q: Point, sig: tuple[int], m: int) -> bool:
         """
@@ -113,27 +188,43 @@ class ECDSA:
         @param sig : Message to check signature.
         @param m : Message which has been signed
         """
-        x, y = sig["x"], sig["y"]
-        O = Point(INF, INF, self.curve.a, self.curve.b, self.curve.p)
-        if Q == O or not self.curve.onCuve(Q.x, Q.y):
-            print("infinity 1")
-            return False
-
-        elif n * Q != O:
-            print("infinity 2")
-            return False
-
-        elif 1 > x or x > n - 1 or 1 > y or y > n - 1:
-            print("beyond")
-            return False
+        return self.verify_batch(G, n, [(Q, sig, m)])[0]
 
-        y_inv = invert(y, n)
-        u = pow(m * y_inv, 1, n)
-        v = pow(x * y_inv, 1, n)
-        V = u * G + v * Q
-        print("Verify", pow(V.x, 1, n), x)
-
-        return pow(V.x, 1, n) == x
+    def verify_batch(self, G: Point, n: int, items) -> list[bool]:
+        """
+        Verify many signatures made with the same base point.
+        u * G + v * Q is computed with a single chain of doublings (Shamir's trick) from
+        odd multiples tables of G and Q, cached with the subgroup check of each key.
+        The y of the signatures are inverted together (batch_invert) and the x-coordinate
+        is compared in Jacobian coordinates.
+        @param G : Base point for the signature.
+        @param n : Order of base point G.
+        @param items : Iterable of (Q, sig, m), public key, signature and signed message.
+        @return: list of bool
+        """
+        p = self.curve.p
+        base = self._base_table(G)
+
+        # Signatures which pass the key and range checks, their y are inverted together
+        items = list(items)
+        results = [False] * len(items)
+        checked = []
+        for i, (Q, sig, m) in enumerate(items):
+            x, y = sig["x"], sig["y"]
+            key = self._key_table(Q, n)
+            if key is not None and 0 < x < n and 0 < y < n:
+                checked.append((i, key, x, y, m))
+
+        y_inv = batch_invert([y for _, _, _, y, _ in checked], n)
+        for (i, key, x, y, m), w in zip(checked, y_inv):
+            u = pow(m * w, 1, n)
+            v = pow(x * w, 1, n)
+            V = multi_scalar_mul([(u, base), (v, key)])
+
+            # V.x = X / Z² and x = V.x mod n, V.x < p
+            zz = V.Z * V.Z % p
+            results[i] = V.Z != 0 and any(V.X == r * zz % p for r in range(x, p, n))
+        return results
 
 
 def testElgamal():
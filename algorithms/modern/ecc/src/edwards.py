@@ -0,0 +1,148 @@
+"""
+Twisted Edwards curves ax^2 + y^2 = 1 + dx^2y^2 mod p.
+Points are kept in extended coordinates (X : Y : Z : T) with x = X/Z, y = Y/Z and
+xy = T/Z (Hisil, Wong, Carter, Dawson 2008). When a is a square and d is not, the
+addition law is complete: the same formula adds distinct points, doubles and handles
+the identity (0, 1), so scalar multiplication has no special case.
+"""
+from utils import invert, legendre
+
+
+class TwistedEdwardsCurve:
+    """
+    @param a, d: Curve parameters, a * d * (a - d) != 0 mod p.
+    @param p: Prime number defining the field.
+    """
+
+    def __init__(self, a: int, d: int, p: int):
+        if a * d * (a - d) % p == 0:
+            raise ValueError("The curve is singular")
+        self.a = a % p
+        self.d = d % p
+        self.p = p
+        self.complete = legendre(self.a, p) == 1 and legendre(self.d, p) == -1
+        self.identity = EdwardsPoint(0, 1, 1, 0, self)
+
+    def onCurve(self, x: int, y: int) -> bool:
+        x2, y2 = x * x, y * y
+        return (self.a * x2 + y2 - 1 - self.d * x2 * y2) % self.p == 0
+
+    def point(self, x: int, y: int):
+        """Point (x, y) of the curve, checked to be on it."""
+        if not self.onCurve(x, y):
+            raise ValueError("Point is not on the curve")
+        return EdwardsPoint(x % self.p, y % self.p, 1, x * y % self.p, self)
+
+    def __str__(self):
+        return f"Curve: {self.a}x^2 + y^2 = 1 + {self.d}x^2y^2 [{self.p}]"
+
+
+class EdwardsPoint:
+    """Point (X : Y : Z : T) in extended coordinates."""
+
+    __slots__ = ("X", "Y", "Z", "T", "curve")
+
+    def __init__(self, X: int, Y: int, Z: int, T: int, curve: TwistedEdwardsCurve):
+        self.X, self.Y, self.Z, self.T = X, Y, Z, T
+        self.curve = curve
+
+    def to_affine(self):
+        p = self.curve.p
+        z_inv = invert(self.Z, p)
+        return self.X * z_inv % p, self.Y * z_inv % p
+
+    def __str__(self):
+        return str(self.to_affine())
+
+    def __eq__(self, Q):
+        p = self.curve.p
+        return (self.X * Q.Z - Q.X * self.Z) % p == 0 and (self.Y * Q.Z - Q.Y * self.Z) % p == 0
+
+    def __neg__(self):
+        p = self.curve.p
+        return EdwardsPoint(-self.X % p, self.Y, self.Z, -self.T % p, self.curve)
+
+    def __add__(self, Q):
+        """
+        add-2008-hwcd: A = X1X2, B = Y1Y2, C = dT1T2, D = Z1Z2, E = (X1 + Y1)(X2 + Y2) - A - B
+        F = D - C, G = D + C, H = B - aA, X3 = EF, Y3 = GH, T3 = EH, Z3 = FG
+        """
+        curve = self.curve
+        p = curve.p
+        A = self.X * Q.X % p
+        B = self.Y * Q.Y % p
+        C = curve.d * self.T * Q.T % p
+        D = self.Z * Q.Z % p
+        E = ((self.X + self.Y) * (Q.X + Q.Y) - A - B) % p
+        F = D - C
+        G = D + C
+        H = B - curve.a * A
+        return EdwardsPoint(E * F % p, G * H % p, F * G % p, E * H % p, curve)
+
+    def __sub__(self, Q):
+        return self + (-Q)
+
+    def double(self):
+        """
+        dbl-2008-hwcd: A = X1^2, B = Y1^2, C = 2Z1^2, D = aA, E = (X1 + Y1)^2 - A - B
+        G = D + B, F = G - C, H = D - B, X3 = EF, Y3 = GH, T3 = EH, Z3 = FG
+        """
+        curve = self.curve
+        p = curve.p
+        A = self.X * self.X % p
+        B = self.Y * self.Y % p
+        C = 2 * self.Z * self.Z % p
+        D = curve.a * A % p
+        E = ((self.X + self.Y) ** 2 - A - B) % p
+        G = D + B
+        F = G - C
+        H = D - B
+        return EdwardsPoint(E * F % p, G * H % p, F * G % p, E * H % p, curve)
+
+    def __mul__(self, k: int):
+        """
+        Montgomery ladder: R[0] = m * P and R[1] = (m + 1) * P, every bit of k costs
+        one addition and one doubling, the bit only selects the operands.
+        """
+        if k < 0:
+            return (-self) * (-k)
+        R = [self.curve.identity, self]
+        for t in range(k.bit_length() - 1, -1, -1):
+            bit = (k >> t) & 1
+            R[1 - bit] = R[0] + R[1]
+            R[bit] = R[bit].double()
+        return R[0]
+
+    def __rmul__(self, k: int):
+        return self.__mul__(k)
+
+    def to_montgomery(self) -> int:
+        """u = (1 + y) / (1 - y), x-coordinate of the point on the birationally equivalent Montgomery curve."""
+        p = self.curve.p
+        return (self.Z + self.Y) * invert(self.Z - self.Y, p) % p
+
+
+# Edwards25519 (RFC 8032): -x^2 + y^2 = 1 - (121665/121666)x^2y^2
+_P25519 = 2**255 - 19
+ED25519 = TwistedEdwardsCurve(-1, -121665 * invert(121666, _P25519), _P25519)
+ED25519_BASE = ED25519.point(
+    15112221349535400772501151409588531511454012693041857206046113283949847762202,
+    46316835694926478169428394003475163141307993866256225615783033603165251855960,
+)
+ED25519_ORDER = 2**252 + 27742317777372353535851937790883648493
+
+
+if __name__ == "__main__":
+    from montgomery import CURVE25519
+    from random import randint
+
+    B = ED25519_BASE
+    assert ED25519.complete
+    assert B * ED25519_ORDER == ED25519.identity
+    assert B.to_montgomery() == 9
+
+    # Same scalar multiplication on the Edwards and Montgomery forms
+    k = randint(1, ED25519_ORDER - 1)
+    assert (k * B).to_montgomery() == CURVE25519.ladder(k, 9)
+    assert k * B + B == (k + 1) * B and k * B - k * B == ED25519.identity
+    print("Ed25519 ok")
@@ -1,13 +1,28 @@
+import os
 import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.figure import Figure
 from random import randint
 
+# Contour grids shared by every plot: (window, precision) -> (x, y)
+_GRIDS = {}
+
+
+def grid(window, precision=1000j):
+    """Open grid of [-window, window]^2, built once for each window and precision."""
+    key = (window, precision)
+    if key not in _GRIDS:
+        y, x = np.ogrid[-window:window:precision, -window:window:precision]
+        _GRIDS[key] = (x, y)
+    return _GRIDS[key]
+
 
 class CartesianPlan:
     x_plots = 0
     y_plots = 0
     axes = None
     fig = None
+    headless = False
     x = None
     y = None
 
@@ -15,8 +30,17 @@ class CartesianPlan:
         self.n_plots = n_plots
         self.title = title
 
-    def init_plot(self):
-        fig, axes = plt.subplots(self.n_plots[0], self.n_plots[1])
+    def init_plot(self, headless=False):
+        """
+        headless: the figure is a matplotlib.figure.Figure which is not registered in pyplot,
+        it can only be saved (show(path)) and works without a display.
+        """
+        self.headless = headless
+        if headless:
+            fig = Figure()
+            axes = fig.subplots(self.n_plots[0], self.n_plots[1])
+        else:
+            fig, axes = plt.subplots(self.n_plots[0], self.n_plots[1])
 
         # Move left y-axis and bottom x-axis to centre, passing through (0,0)
         for i in range(self.n_plots[0]):
@@ -48,8 +72,7 @@ class CartesianPlan:
 
     def curve2(self, window, function, parameters, title=None):
         ax = self.axes[self.x_plots, self.y_plots]
-        precision = 1000j
-        y, x = np.ogrid[-window:window:precision, -window:window:precision]
+        x, y = grid(window)
         ax.contour(x.ravel(), y.ravel(), function(x, y, parameters), [0])
         ax.grid(True)
         if title is not None:
@@ -70,15 +93,21 @@ class CartesianPlan:
             ax.set_title(title)
         self.increment_plots()
 
-    def show(self):
+    def show(self, path=None):
+        """Show the figure, or save it to `path` (batch rendering without a display)."""
         self.fig.suptitle(self.title)
-        plt.show()
+        if path is None:
+            plt.show()
+        else:
+            self.fig.savefig(path)
+            if not self.headless:
+                plt.close(self.fig)
 
 
-def examples_smooth_curves(title="Smooth curves"):
+def examples_smooth_curves(title="Smooth curves", path=None):
 
     plan = CartesianPlan((2, 3), title)
-    plan.init_plot()
+    plan.init_plot(headless=path is not None)
 
     # **Ellipse**
     ellipse = lambda a, b, t: (a * np.cos(t), b * np.sin(t))
@@ -129,28 +158,21 @@ def examples_smooth_curves(title="Smooth curves"):
     curve = lambda a, b, x: np.sqrt(x**3 + a * x + b)
     a, b = -1, 1  # Example parameters
     x_np = np.linspace(-2, 2, 300)
-    x = []
-    y_pos = []
-    y_neg = []
-    for x_i in x_np:
-        if x_i**3 + a * x_i + b >= 0:
-            x.append(x_i)
-            y_i = curve(a, b, x_i)
-            y_pos.append(y_i)
-            y_neg.append(-y_i)
+    x = x_np[x_np**3 + a * x_np + b >= 0]
+    y_pos = curve(a, b, x)
 
     x = np.concatenate([x[::-1], x])
-    y = np.concatenate([y_pos[::-1], y_neg])
+    y = np.concatenate([y_pos[::-1], -y_pos])
 
     plan.curve(x, y, title=rf"$Y^2 = X^3 + {a}X + {b}$")
 
-    plan.show()
+    plan.show(path)
 
 
-def examples_weirstrass(title="Weirstrass form"):
+def examples_weirstrass(title="Weirstrass form", path=None):
 
     plan = CartesianPlan((2, 3), title)
-    plan.init_plot()
+    plan.init_plot(headless=path is not None)
 
     # **Elliptic Curve**: \( Y^2 = X^3 + aX + b \)
     weierstrass = lambda x, y, parameters: (
@@ -178,13 +200,13 @@ def examples_weirstrass(title="Weirstrass form"):
         )
 
     # plan.curve2(window, ec_sigular, [1], title=rf"$Y^2 = X^3 + X^2$")
-    plan.show()
+    plan.show(path)
 
 
-def examples_edward(title="Edward form"):
+def examples_edward(title="Edward form", path=None):
 
     plan = CartesianPlan((2, 5), title)
-    plan.init_plot()
+    plan.init_plot(headless=path is not None)
 
     # **Edward Curve**: \( Y^2 + X^2 = 1 + dX^2Y^2 \)
     edward = lambda x, y, parameters: y**2 + x**2 - (1 + parameters[0] * (x * y) ** 2)
@@ -211,13 +233,13 @@ def examples_edward(title="Edward form"):
         )
 
     # plan.curve2(window, ec_sigular, [1], title=rf"$Y^2 = X^3 + X^2$")
-    plan.show()
+    plan.show(path)
 
 
-def examples_montgomery(title="Montgomery form"):
+def examples_montgomery(title="Montgomery form", path=None):
 
     plan = CartesianPlan((2, 3), title)
-    plan.init_plot()
+    plan.init_plot(headless=path is not None)
 
     # **Elliptic Curve**: \( Y^2 = X^3 + aX + b \)
     weierstrass = lambda x, y, parameters: parameters[1] * y**2 - (
@@ -243,7 +265,13 @@ def examples_montgomery(title="Montgomery form"):
         )
 
     # plan.curve2(window, ec_sigular, [1], title=rf"$Y^2 = X^3 + X^2$")
-    plan.show()
+    plan.show(path)
+
+
+def save_examples(directory="."):
+    """Render every example to PNG files in `directory`, pyplot and its backend are left untouched."""
+    for example in (examples_smooth_curves, examples_weirstrass, examples_edward, examples_montgomery):
+        example(path=os.path.join(directory, f"{example.__name__}.png"))
 
 
 if __name__ == "__main__":
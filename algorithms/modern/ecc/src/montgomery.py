@@ -0,0 +1,124 @@
+"""
+Montgomery curves By^2 = x^3 + Ax^2 + x mod p.
+Scalar multiplication only needs the x-coordinate: the Montgomery ladder works on
+projective (X : Z) pairs and does one differential addition and one doubling per bit
+of the scalar, whatever its value (RFC 7748).
+"""
+from utils import invert
+
+
+class MontgomeryCurve:
+    """
+    @param A, B: Curve parameters, B(A^2 - 4) != 0 mod p.
+    @param p: Prime number defining the field.
+    """
+
+    def __init__(self, A: int, B: int, p: int):
+        if B * (A * A - 4) % p == 0:
+            raise ValueError("The curve is singular")
+        self.A = A
+        self.B = B
+        self.p = p
+        # Constant of the doubling formula
+        self.a24 = (A + 2) * invert(4, p) % p
+
+    def onCurve(self, x: int, y: int) -> bool:
+        p = self.p
+        return (self.B * y * y - x**3 - self.A * x * x - x) % p == 0
+
+    def ladder(self, k: int, u: int) -> int:
+        """
+        x-coordinate of k * P, u being the x-coordinate of P.
+        The two points (x2 : z2) = m * P and (x3 : z3) = (m + 1) * P are swapped with a mask
+        instead of a branch on the bits of k.
+        @return: int (0 for the point at infinity)
+        """
+        p, a24 = self.p, self.a24
+        x1 = u % p
+        x2, z2, x3, z3 = 1, 0, x1, 1
+        swap = 0
+
+        for t in range(k.bit_length() - 1, -1, -1):
+            bit = (k >> t) & 1
+            swap ^= bit
+            mask = -swap
+            dummy = mask & (x2 ^ x3)
+            x2, x3 = x2 ^ dummy, x3 ^ dummy
+            dummy = mask & (z2 ^ z3)
+            z2, z3 = z2 ^ dummy, z3 ^ dummy
+            swap = bit
+
+            A = x2 + z2
+            AA = A * A % p
+            B = x2 - z2
+            BB = B * B % p
+            E = AA - BB
+            C = x3 + z3
+            D = x3 - z3
+            DA = D * A % p
+            CB = C * B % p
+            x3 = (DA + CB) ** 2 % p
+            z3 = x1 * (DA - CB) ** 2 % p
+            x2 = AA * BB % p
+            z2 = E * (BB + a24 * E) % p
+
+        mask = -swap
+        dummy = mask & (x2 ^ x3)
+        x2 = x2 ^ dummy
+        dummy = mask & (z2 ^ z3)
+        z2 = z2 ^ dummy
+        return x2 * pow(z2, p - 2, p) % p
+
+    def to_weierstrass(self, x: int = None, y: int = None):
+        """
+        The curve is mapped to y^2 = x^3 + ax + b by (x, y) -> ((x + A/3) / B, y / B).
+        @return: (a, b) or (a, b, x', y') when a point (x, y) is given.
+        """
+        p, A, B = self.p, self.A, self.B
+        inv3, inv_b = invert(3, p), invert(B, p)
+        a = (3 - A * A) * inv3 * inv_b * inv_b % p
+        b = (2 * A**3 - 9 * A) * invert(27, p) * pow(inv_b, 3, p) % p
+        if x is None:
+            return a, b
+        return a, b, (x + A * inv3) * inv_b % p, y * inv_b % p
+
+    def __str__(self):
+        return f"Curve: {self.B}y^2 = x^3 + {self.A}x^2 + x [{self.p}]"
+
+
+# Curve25519 (RFC 7748), base point u = 9
+CURVE25519 = MontgomeryCurve(486662, 1, 2**255 - 19)
+CURVE25519_BASE = (9, 14781619447589544791020593568409986887264606134616475288964881837755586237401)
+
+
+def x25519(k: bytes, u: bytes = (9).to_bytes(32, "little")) -> bytes:
+    """
+    X25519 function of RFC 7748: the scalar is clamped, both inputs are 32 bytes little endian.
+    @param k: Private key.
+    @param u: x-coordinate of the peer public key (the base point by default).
+    @return: 32 bytes
+    """
+    scalar = bytearray(k)
+    scalar[0] &= 248
+    scalar[31] &= 127
+    scalar[31] |= 64
+    u = int.from_bytes(u, "little") & ((1 << 255) - 1)
+    return CURVE25519.ladder(int.from_bytes(scalar, "little"), u).to_bytes(32, "little")
+
+
+if __name__ == "__main__":
+    # RFC 7748 section 5.2
+    k = bytes.fromhex("a546e36bf0527c9d3b16154b82465edd62144c0ac1fc5a18506a2244ba449ac4")
+    u = bytes.fromhex("e6db6867583030db3594c1a424b15f7c726624ec26b3353b10a903a6d0ab1c4c")
+    assert x25519(k, u).hex() == "c3da55379de9c6908e94ea4df28d084f32eccf03491c71f754b4075577a28552"
+
+    # RFC 7748 section 6.1
+    alice = bytes.fromhex("77076d0a7318a57d3c16c17251b26645df4c2f87ebc0992ab177fba51db92c2a")
+    bob = bytes.fromhex("5dab087e624a8a4b79e17f8b83800ee66f3bb1292618b6fd1c2f8b27ff88e0eb")
+    alice_public = x25519(alice)
+    bob_public = x25519(bob)
+    assert alice_public.hex() == "8520f0098930a754748b7ddcb43ef75a0dbf3a0d26381af4eba4a98eaa9b4e6a"
+    assert bob_public.hex() == "de9edb7d7b7dc1b4d35b61c2ece435373f8343c85b78674dadfc7e146f882b4f"
+    shared = x25519(alice, bob_public)
+    assert shared == x25519(bob, alice_public)
+    print(f"Shared secret: {shared.hex()}")
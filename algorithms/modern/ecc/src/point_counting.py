@@ -0,0 +1,444 @@
+"""
+Number of points of the curve y^2 = x^3 + ax + b over Fp.
+
+- p < NAIVE_LIMIT: sum of Legendre symbols, #E = p + 1 + sum((x^3 + ax + b / p)).
+- p < SCHOOF_LIMIT: baby-step giant-step on Hasse's interval [p + 1 - 2√p, p + 1 + 2√p] (Mestre),
+  the quadratic twist removes the ambiguity when the orders of the points are too small.
+- otherwise: Schoof's algorithm, the trace t = p + 1 - #E is computed modulo small primes l
+  in Fp[x]/ψl(x) and recombined with the CRT.
+
+Points are handled here as (x, y) tuples, None being the point at infinity.
+"""
+from math import isqrt, lcm
+from random import randrange
+
+from gmpy2 import mpz
+from sympy import factorint, nextprime
+from sympy.ntheory.modular import crt
+
+from utils import legendre, sqrt_mod
+
+NAIVE_LIMIT = 1 << 12
+SCHOOF_LIMIT = 1 << 72
+
+
+def count_points(a: int, b: int, p: int) -> int:
+    """
+    Number of points of the curve, the point at infinity included.
+    @param a, b: Coefficients of the curve.
+    @param p: Prime number defining the field.
+    @return: int
+    """
+    if p < NAIVE_LIMIT:
+        return count_points_naive(a, b, p)
+
+    if (4 * a**3 + 27 * b**2) % p == 0:
+        raise ValueError("The curve is singular")
+
+    if p < SCHOOF_LIMIT:
+        return count_points_bsgs(a, b, p)
+    return count_points_schoof(a, b, p)
+
+
+def count_points_naive(a: int, b: int, p: int) -> int:
+    """ O(p log p): every x gives 1 + (x^3 + ax + b / p) points.  """
+    return p + 1 + sum(legendre(x**3 + a * x + b, p) for x in range(p))
+
+
+# Affine arithmetic on tuples
+def _add(P, Q, a, p):
+    if P is None:
+        return Q
+    if Q is None:
+        return P
+
+    x1, y1 = P
+    x2, y2 = Q
+    if x1 == x2:
+        if (y1 + y2) % p == 0:
+            return None
+        m = (3 * x1 * x1 + a) * pow(2 * y1, -1, p)
+    else:
+        m = (y2 - y1) * pow(x2 - x1, -1, p)
+
+    x3 = (m * m - x1 - x2) % p
+    return x3, (m * (x1 - x3) - y1) % p
+
+
+def _mul(P, n, a, p):
+    R = None
+    for bit in bin(n)[2:]:
+        R = _add(R, R, a, p)
+        if bit == "1":
+            R = _add(R, P, a, p)
+    return R
+
+
+def _random_point(a, b, p):
+    while True:
+        x = randrange(p)
+        rhs = (x**3 + a * x + b) % p
+        if legendre(rhs, p) == 1:
+            return x, sqrt_mod(rhs, p)
+
+
+def order_from_multiple(P, m: int, a: int, p: int) -> int:
+    """
+    Order of P knowing that mP = O: prime factors are removed from m while the
+    multiple stays the identity.
+    """
+    for q, e in factorint(m).items():
+        for _ in range(e):
+            if _mul(P, m // q, a, p) is not None:
+                break
+            m //= q
+    return m
+
+
+def _bsgs_multiple(P, low, high, a, p):
+    """
+    Some m in [low, high] such that mP = O.
+    Baby steps jP for 0 <= j <= s, giant steps cP with c = low + s + i(2s + 1), each
+    giant step checks the 2s + 1 multiples c - s, ..., c + s thanks to x(-jP) = x(jP).
+    """
+    s = isqrt(high - low) // 2 + 1
+    baby = {}
+    R = None
+    for j in range(s + 1):
+        baby.setdefault(None if R is None else R[0], (j, R))
+        R = _add(R, P, a, p)
+
+    step = _mul(P, 2 * s + 1, a, p)
+    c = low + s
+    G = _mul(P, c, a, p)
+    while c - s <= high:
+        found = baby.get(None if G is None else G[0])
+        if found is not None:
+            j, J = found
+            return c - j if G == J else c + j
+        G = _add(G, step, a, p)
+        c += 2 * s + 1
+    raise ArithmeticError("No multiple of the point in Hasse's interval")
+
+
+def _multiples(L, low, high):
+    return range(-(-low // L) * L, high + 1, L)
+
+
+def count_points_bsgs(a: int, b: int, p: int) -> int:
+    """
+    Mestre's algorithm, O(p^(1/4)) group operations.
+    #E is the only value of Hasse's interval which is a multiple of the order of random
+    points of E and whose twist count 2p + 2 - #E is a multiple of the orders of random
+    points of the twist E': y^2 = x^3 + ad^2x + bd^3, d being a non-residue.
+    """
+    r = isqrt(4 * p)
+    low, high = p + 1 - r, p + 1 + r
+
+    d = 2
+    while legendre(d, p) != -1:
+        d += 1
+    curves = [(a % p, b % p), (a * d * d % p, b * d**3 % p)]
+    orders = [1, 1]
+
+    for i in range(64):
+        k = i % 2
+        ck, bk = curves[k]
+        P = _random_point(ck, bk, p)
+        m = _bsgs_multiple(P, low, high, ck, p)
+        orders[k] = lcm(orders[k], order_from_multiple(P, m, ck, p))
+
+        # Hasse's interval is symmetric around p + 1, so it is also the interval of the twist
+        if orders[0] >= orders[1]:
+            candidates = [n for n in _multiples(orders[0], low, high) if (2 * p + 2 - n) % orders[1] == 0]
+        else:
+            candidates = [2 * p + 2 - n for n in _multiples(orders[1], low, high) if (2 * p + 2 - n) % orders[0] == 0]
+        if len(candidates) == 1:
+            return candidates[0]
+    raise ArithmeticError("Point counting did not converge")
+
+
+# Polynomials over Fp: lists of coefficients, lowest degree first, without trailing zeros.
+def _strip(f):
+    while f and not f[-1]:
+        f.pop()
+    return f
+
+
+def _poly_mul(f, g, p):
+    """ Product by Kronecker substitution: both polynomials are packed into integers multiplied by GMP.  """
+    if not f or not g:
+        return []
+    slot = (2 * p.bit_length() + min(len(f), len(g)).bit_length() + 7) // 8
+    F = mpz(int.from_bytes(b"".join(c.to_bytes(slot, "little") for c in f), "little"))
+    G = mpz(int.from_bytes(b"".join(c.to_bytes(slot, "little") for c in g), "little"))
+    data = int(F * G).to_bytes(slot * (len(f) + len(g) - 1), "little")
+    return _strip([int.from_bytes(data[i:i + slot], "little") % p for i in range(0, len(data), slot)])
+
+
+def _poly_add(f, g, p):
+    if len(f) < len(g):
+        f, g = g, f
+    return _strip([(c + d) % p for c, d in zip(f, g)] + f[len(g):])
+
+
+def _poly_sub(f, g, p):
+    return _poly_add(f, [-c % p for c in g], p)
+
+
+def _poly_scale(f, c, p):
+    return _strip([c * x % p for x in f])
+
+
+def _poly_divmod(f, g, p):
+    f = f[:]
+    dg = len(g) - 1
+    inv = pow(g[-1], -1, p)
+    q = [0] * max(len(f) - dg, 0)
+    for i in range(len(f) - 1, dg - 1, -1):
+        c = f[i] * inv % p
+        if c:
+            q[i - dg] = c
+            f[i - dg:i + 1] = [(x - c * y) % p for x, y in zip(f[i - dg:i + 1], g)]
+    return _strip(q), _strip(f[:dg])
+
+
+def _poly_gcd(f, g, p):
+    while g:
+        f, g = g, _poly_divmod(f, g, p)[1]
+    return _poly_scale(f, pow(f[-1], -1, p), p)
+
+
+class _Split(Exception):
+    """ A non-invertible element revealed the factor `factor` of the modulus.  """
+
+    def __init__(self, factor):
+        self.factor = factor
+
+
+class _QuotientRing:
+    """ Fp[x]/(h), h monic. The reduction uses a precomputed inverse of reversed h (Barrett).  """
+
+    def __init__(self, h, p):
+        self.h = h
+        self.p = p
+        self.d = len(h) - 1
+
+        # 1 / rev(h) as a power series, by Newton iteration g <- g(2 - rev(h)g)
+        rev = h[::-1]
+        g, k = [1], 1
+        while k < self.d:
+            k *= 2
+            e = _poly_mul(rev[:k], g, p)[:k]
+            g = _poly_mul(g, _poly_sub([2], e, p), p)[:k]
+        self.h_inv = g
+        self.precision = k
+
+    def reduce(self, f):
+        n = len(f) - self.d
+        if n <= 0:
+            return f
+        if n > self.precision:
+            return _poly_divmod(f, self.h, self.p)[1]
+        q = _poly_mul(f[::-1][:n], self.h_inv[:n], self.p)[:n]
+        q = q + [0] * (n - len(q))
+        return _poly_sub(f[:self.d], _poly_mul(q[::-1], self.h, self.p)[:self.d], self.p)
+
+    def mul(self, f, g):
+        return self.reduce(_poly_mul(f, g, self.p))
+
+    def pow(self, f, e):
+        result = [1]
+        for bit in bin(e)[2:]:
+            result = self.mul(result, result)
+            if bit == "1":
+                result = self.mul(result, f)
+        return result
+
+    def inverse(self, f):
+        """ Extended Euclid, raises _Split when f is a zero divisor.  """
+        p = self.p
+        r0, r1 = self.h, f
+        s0, s1 = [], [1]
+        while len(r1) > 1:
+            q, r = _poly_divmod(r0, r1, p)
+            r0, r1 = r1, r
+            s0, s1 = s1, _poly_sub(s0, _poly_mul(q, s1, p), p)
+        if not r1:
+            raise _Split(_poly_scale(r0, pow(r0[-1], -1, p), p))
+        return _poly_scale(s1, pow(r1[0], -1, p), p)
+
+
+def division_polynomials(a: int, b: int, p: int, n: int):
+    """
+    ψ0, ..., ψn. ψk is a polynomial in x for odd k, for even k the list holds ψk / y.
+    y^2 is replaced by f = x^3 + ax + b.
+    """
+    f = _strip([b % p, a % p, 0, 1])
+    f2 = _poly_mul(f, f, p)
+    half = pow(2, -1, p)
+    mul = lambda *fs: _mul_all(fs, p)
+
+    psi = [[], [1], [2], _strip([-a * a % p, 12 * b % p, 6 * a % p, 0, 3]),
+           _strip([(-4 * a**3 - 32 * b * b) % p, -16 * a * b % p, -20 * a * a % p, 80 * b % p, 20 * a % p, 0, 4])]
+    for k in range(5, n + 1):
+        m = k // 2
+        if k % 2:
+            if m % 2 == 0:
+                value = _poly_sub(mul(f2, psi[m + 2], psi[m], psi[m], psi[m]), mul(psi[m - 1], psi[m + 1], psi[m + 1], psi[m + 1]), p)
+            else:
+                value = _poly_sub(mul(psi[m + 2], psi[m], psi[m], psi[m]), mul(f2, psi[m - 1], psi[m + 1], psi[m + 1], psi[m + 1]), p)
+        else:
+            inner = _poly_sub(mul(psi[m + 2], psi[m - 1], psi[m - 1]), mul(psi[m - 2], psi[m + 1], psi[m + 1]), p)
+            value = _poly_scale(mul(psi[m], inner), half, p)
+        psi.append(value)
+    return psi[:n + 1]
+
+
+def _mul_all(fs, p):
+    result = [1]
+    for f in fs:
+        result = _poly_mul(result, f, p)
+    return result
+
+
+# Points of E over Fp[x]/(h) are written (X, V): x-coordinate X(x), y-coordinate y.V(x).
+# They are the points of the curve f.v^2 = x^3 + ax + b, on which the group law is computed.
+def _ring_add(R, P, Q, f, a):
+    """ Affine addition, may raise _Split.  """
+    if P is None:
+        return Q
+    if Q is None:
+        return P
+
+    p = R.p
+    (x1, v1), (x2, v2) = P, Q
+    if x1 == x2:
+        if v1 == v2:
+            m = R.mul(_poly_add(_poly_scale(R.mul(x1, x1), 3, p), [a % p] if a % p else [], p),
+                      R.inverse(_poly_scale(R.mul(f, v1), 2, p)))
+        elif not _poly_add(v1, v2, p):
+            return None
+        else:
+            raise _Split(_poly_gcd(R.h, _poly_sub(v1, v2, p), p))
+    else:
+        m = R.mul(_poly_sub(v2, v1, p), R.inverse(_poly_sub(x2, x1, p)))
+
+    x3 = _poly_sub(R.mul(f, R.mul(m, m)), _poly_add(x1, x2, p), p)
+    return x3, _poly_sub(R.mul(m, _poly_sub(x1, x3, p)), v1, p)
+
+
+def _jacobian_double(R, P, f, a):
+    """ (X, V, Z) with x = X/Z^2, v = V/Z^3 on f.v^2 = x^3 + ax + b.  """
+    p = R.p
+    X, V, Z = P
+    ZZ = R.mul(Z, Z)
+    M = _poly_add(_poly_scale(R.mul(X, X), 3, p), _poly_scale(R.mul(ZZ, ZZ), a % p, p), p)
+    fV = R.mul(f, V)
+    fVV = R.mul(fV, V)
+    S = _poly_scale(R.mul(R.mul(X, fVV), f), 4, p)
+    X3 = _poly_sub(R.mul(f, R.mul(M, M)), _poly_scale(S, 2, p), p)
+    V3 = _poly_sub(R.mul(M, _poly_sub(S, X3, p)), _poly_scale(R.mul(R.mul(fVV, fVV), f), 8, p), p)
+    return X3, V3, _poly_scale(R.mul(fV, Z), 2, p)
+
+
+def _jacobian_add_affine(R, P, Q, f):
+    """ P + Q for P Jacobian and Q affine, P != ±Q.  """
+    p = R.p
+    X1, V1, Z1 = P
+    x2, v2 = Q
+    ZZ = R.mul(Z1, Z1)
+    H = _poly_sub(R.mul(x2, ZZ), X1, p)
+    r = _poly_sub(R.mul(v2, R.mul(ZZ, Z1)), V1, p)
+    HH = R.mul(H, H)
+    HHH = R.mul(HH, H)
+    X1HH = R.mul(X1, HH)
+    X3 = _poly_sub(R.mul(f, R.mul(r, r)), _poly_add(HHH, _poly_scale(X1HH, 2, p), p), p)
+    V3 = _poly_sub(R.mul(r, _poly_sub(X1HH, X3, p)), R.mul(V1, HHH), p)
+    return X3, V3, R.mul(H, Z1)
+
+
+def _trace_mod_l(l, psi_l, a, b, p):
+    """ t mod l, from the relation π^2 - tπ + p = 0 on the l-torsion.  """
+    h = _poly_scale(psi_l, pow(psi_l[-1], -1, p), p)
+    while True:
+        try:
+            return _trace_mod_factor(l, h, a, b, p)
+        except _Split as e:
+            # Any factor of ψl defines l-torsion points stable under the Frobenius map
+            g = e.factor
+            other = _poly_divmod(h, g, p)[0]
+            h = g if len(g) <= len(other) else other
+
+
+def _trace_mod_factor(l, h, a, b, p):
+    R = _QuotientRing(h, p)
+    f = R.reduce(_strip([b % p, a % p, 0, 1]))
+    x = R.reduce([0, 1])
+
+    # Frobenius: π(x, y) = (x^p, y.f^((p-1)/2)), π^2 by applying it twice
+    xp = R.pow(x, p)
+    vp = R.pow(f, (p - 1) // 2)
+    pi2 = (R.pow(xp, p), R.mul(vp, R.pow(vp, p)))
+
+    # [p mod l](x, y), 2 <= k < l so the intermediate points are never ±(x, y)
+    k = p % l
+    Q = (x, [1])
+    if k > 1:
+        J = (x, [1], [1])
+        for bit in bin(k)[3:]:
+            J = _jacobian_double(R, J, f, a)
+            if bit == "1":
+                J = _jacobian_add_affine(R, J, Q, f)
+        z = R.inverse(J[2])
+        zz = R.mul(z, z)
+        Q = (R.mul(J[0], zz), R.mul(J[1], R.mul(zz, z)))
+
+    target = _ring_add(R, pi2, Q, f, a)
+    if target is None:
+        return 0
+
+    # τπ for τ = 1, ..., (l - 1)/2, the sign of τ is given by the y-coordinate
+    xt, vt = target
+    J = (xp, vp, [1])
+    for tau in range(1, (l + 1) // 2):
+        if tau == 2:
+            J = _jacobian_double(R, (xp, vp, [1]), f, a)
+        elif tau > 2:
+            J = _jacobian_add_affine(R, J, (xp, vp), f)
+        X, V, Z = J
+        ZZ = R.mul(Z, Z)
+        if X == R.mul(xt, ZZ):
+            return tau if V == R.mul(vt, R.mul(ZZ, Z)) else l - tau
+    raise ArithmeticError(f"No trace found modulo {l}")
+
+
+def count_points_schoof(a: int, b: int, p: int) -> int:
+    """ Schoof's algorithm, polynomial in log p.  """
+    bound = 4 * isqrt(p) + 4
+    moduli, residues = [], []
+
+    # l = 2: t is even iff the curve has a point of order 2, i.e. x^3 + ax + b has a root
+    f = _strip([b % p, a % p, 0, 1])
+    xp = _QuotientRing(f, p).pow([0, 1], p)
+    has_root = len(_poly_gcd(f, _poly_sub(xp, [0, 1], p), p)) > 1
+    moduli.append(2)
+    residues.append(0 if has_root else 1)
+
+    primes, product, l = [], 2, 2
+    while product < bound:
+        l = nextprime(l)
+        if l != p:
+            primes.append(l)
+            product *= l
+
+    psi = division_polynomials(a, b, p, primes[-1])
+    for l in primes:
+        moduli.append(l)
+        residues.append(_trace_mod_l(l, psi[l], a, b, p))
+
+    t, M = crt(moduli, residues)
+    t = int(t)
+    if t > M // 2:
+        t -= M
+    return p + 1 - t
@@ -1,15 +1,39 @@
 from math import gcd
 from random import randint
 from matplotlib import pyplot as plt
+from matplotlib.figure import Figure
 import numpy as np
 from sympy import mod_inverse as invert
-from sympy import isprime
+from sympy import isprime, factorint
 
 
 def weierstrass(x, y, a, b):
     return pow(y, 2) - pow(x, 3) - a * x - b
 
 
+def batch_invert(values, modulus: int) -> list:
+    """
+    Inverses of all the values modulo `modulus` (Montgomery's trick): one modular inversion
+    and 3(N - 1) multiplications instead of N inversions.\n
+    @param values: Integers invertible mod modulus.
+    @param modulus: Integer number.
+    @return: list of the inverses, in the same order.
+    """
+    # prefix[i] = values[0] * ... * values[i - 1]
+    prefix = []
+    acc = 1
+    for v in values:
+        prefix.append(acc)
+        acc = acc * v % modulus
+
+    inv = pow(acc, -1, modulus)
+    inverses = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        inverses[i] = prefix[i] * inv % modulus
+        inv = inv * values[i] % modulus
+    return inverses
+
+
 def isInvertable(g: int, p: int) -> bool:
     """
     Check if g is invertable in Z/pZ.\n
@@ -38,3 +62,53 @@ def isGenerator(g: int, p: int) -> bool:
         if pow(g, i, p) == 1:
             return False
     return True
+
+
+def legendre(a: int, p: int) -> int:
+    """
+    Legendre symbol (a / p) by Euler's criterion.\n
+    @param a: Integer number.
+    @param p: Odd prime number.
+    @return: 1 if a is a non-zero square mod p, -1 if it is not a square, 0 if p divides a.
+    """
+    s = pow(a, (p - 1) // 2, p)
+    return -1 if s == p - 1 else s
+
+
+def sqrt_mod(a: int, p: int) -> int:
+    """
+    Square root of a modulo the odd prime p (Tonelli-Shanks).\n
+    @param a: Quadratic residue mod p.
+    @param p: Odd prime number.
+    @return: r such that r^2 = a mod p, the other root is p - r.
+    """
+    a %= p
+    if a == 0:
+        return 0
+    if legendre(a, p) != 1:
+        raise ValueError(f"{a} is not a square mod {p}")
+
+    if p % 4 == 3:
+        return pow(a, (p + 1) // 4, p)
+
+    # p - 1 = q * 2^s with q odd
+    q, s = p - 1, 0
+    while q % 2 == 0:
+        q //= 2
+        s += 1
+
+    z = 2
+    while legendre(z, p) != -1:
+        z += 1
+
+    m, c, t, r = s, pow(z, q, p), pow(a, q, p), pow(a, (q + 1) // 2, p)
+    while t != 1:
+        # Least i such that t^(2^i) = 1
+        i, t2 = 0, t
+        while t2 != 1:
+            t2 = t2 * t2 % p
+            i += 1
+        b = pow(c, 1 << (m - i - 1), p)
+        m, c = i, b * b % p
+        t, r = t * c % p, r * b % p
+    return r
@@ -1,54 +1,108 @@
-from utils import np, plt, invert, weierstrass, isprime, randint
+import gc
+from weakref import WeakValueDictionary
+
+from utils import np, plt, Figure, invert, weierstrass, isprime, randint, legendre, sqrt_mod, factorint, batch_invert
+from point_counting import count_points
+from illustrastions import grid
 
 INF = np.inf  # Represents the point at infinity
+WNAF_WIDTH = 4
+FIXED_BASE_WIDTH = 4
+
+
+def wnaf(n: int, w: int = WNAF_WIDTH):
+    """
+    Width-w non-adjacent form of n >= 0, least significant digit first.
+    Every non-zero digit is odd, |digit| < 2^(w-1), and any w consecutive digits
+    contain at most one non-zero digit.
+    """
+    digits = []
+    half, full = 1 << (w - 1), 1 << w
+    while n:
+        if n & 1:
+            d = n & (full - 1)
+            if d >= half:
+                d -= full
+            n -= d
+        else:
+            d = 0
+        digits.append(d)
+        n >>= 1
+    return digits
 
 
 class Point:
     """
     Point on an elliptic curve in Weierstrass form: y² = x³ + ax + b mod p
+    The curve parameters are held by a shared Curve object, the point at
+    infinity of a curve is the singleton curve.infinity.
     """
 
+    __slots__ = ("x", "y", "curve")
+
     def __init__(self, x: int, y: int, a: int, b: int, p: int):
+        curve = Curve(a, b, p)
 
-        if x == np.inf and y == np.inf:
+        if x == INF and y == INF:
             self.x = x
             self.y = y
 
-        elif pow(weierstrass(x, y, a, b), 1, p) == 0:
+        elif curve.onCuve(x, y):
             self.x = x
             self.y = y
 
         else:
             raise ValueError("Point is not on the curve")
 
-        self.a, self.b, self.p = a, b, p
+        self.curve = curve
+
+    @classmethod
+    def unchecked(cls, x: int, y: int, curve):
+        """Build a point known to be on the curve (result of the group law) without checking it."""
+        P = object.__new__(cls)
+        P.x, P.y, P.curve = x, y, curve
+        return P
+
+    @property
+    def a(self):
+        return self.curve.a
+
+    @property
+    def b(self):
+        return self.curve.b
+
+    @property
+    def p(self):
+        return self.curve.p
 
     def __str__(self):
         return "∞" if self.x == INF else f"({self.x}, {self.y})"
 
     def __eq__(self, Q):
-        return self.x == Q.x and self.y == Q.y and self.p == Q.p and self.a == Q.a
+        return self.x == Q.x and self.y == Q.y and self.curve is Q.curve
 
     def __ne__(self, Q):
         return not self == Q
 
+    def __hash__(self):
+        return hash((self.x, self.y, self.curve.a, self.curve.b, self.curve.p))
+
     def square(self):
         """
         Add a point to itself, the number is squared.
         @return: Point
         """
-        if self == Point(INF, INF, self.a, self.b, self.p):
-            return Point(INF, INF, self.a, self.b, self.p)
-
-        elif self.y == 0:
-            return Point(INF, INF, self.a, self.b, self.p)
+        curve = self.curve
+        if self.x == INF or self.y == 0:
+            return curve.infinity
 
         else:
-            m = (3 * self.x**2 + self.a) * invert(2 * self.y, self.p)
+            p = curve.p
+            m = (3 * self.x**2 + curve.a) * invert(2 * self.y, p)
             t = self.y - m * self.x
-            x = pow(m**2 - 2 * self.x, 1, self.p)
-            y = pow(-m * x - t, 1, self.p)
-            return Point(x, y, self.a, self.b, self.p)
+            x = pow(m**2 - 2 * self.x, 1, p)
+            y = pow(-m * x - t, 1, p)
+            return Point.unchecked(x, y, curve)
 
     def __add__(self, Q):
         """
@@ -56,38 +110,34 @@ class Point:
         @param Q: Point
         @return: Point
         """
+        curve = self.curve
 
-        if self.p != Q.p or self.a != Q.a or self.b != Q.b:
+        if curve is not Q.curve:
             raise ValueError("Points are not on the same curve")
 
         elif self.x == Q.x and self.y == Q.y:
             return self.square()
 
-        elif self.x == Q.x and self.y == -Q.y:
-            return Point(INF, INF, self.a, self.b, self.p)
-
-        else:
-            if self == Point(INF, INF, self.a, self.b, self.p):
-                return Q
+        elif self.x == INF:
+            return Q
 
-            elif Q == Point(INF, INF, self.a, self.b, self.p):
-                return self
+        elif Q.x == INF:
+            return self
 
-            else:
-                # Adding two purely distint points
-                delta_x = pow(Q.x - self.x, 1, self.p)
-                delta_y = pow(Q.y - self.y, 1, self.p)
+        else:
+            # Adding two purely distint points
+            p = curve.p
+            delta_x = pow(Q.x - self.x, 1, p)
+            delta_y = pow(Q.y - self.y, 1, p)
 
-                if delta_x == 0:
-                    return Point(INF, INF, self.a, self.b, self.p)
+            if delta_x == 0:
+                return curve.infinity
 
-                else:
-                    m = delta_y * invert(delta_x, self.p)
-                    t = self.y - m * self.x
-                    x = pow(m**2 - self.x - Q.x, 1, self.p)
-                    y = pow(-m * x - t, 1, self.p)
-
-                return Point(x, y, self.a, self.b, self.p)
+            m = delta_y * invert(delta_x, p)
+            t = self.y - m * self.x
+            x = pow(m**2 - self.x - Q.x, 1, p)
+            y = pow(-m * x - t, 1, p)
+            return Point.unchecked(x, y, curve)
 
     def __radd__(self, Q):
         return self.__add__(Q)
@@ -95,54 +145,338 @@ class Point:
     def __neg__(self):
         if self.x == INF:
             return self
-        return Point(self.x, pow(-self.y, 1, self.p), self.a, self.b, self.p)
+        return Point.unchecked(self.x, pow(-self.y, 1, self.curve.p), self.curve)
 
     def __sub__(self, Q):
         return -Q + self
 
     # Multiplication of a point
     def __mul__(self, n: int):
-        if self == Point(INF, INF, self.a, self.b, self.p):
+        """
+        Scalar multiplication in Jacobian coordinates, only one inversion is done
+        when the result is converted back to affine coordinates.
+        """
+        if self.x == INF:
             return self
 
-        elif self.x == INF or self.y == INF:
-            return Point(INF, INF, self.a, self.b, self.p)
+        elif n == 1:
+            return self
 
-        elif n == 0:
-            return Point(INF, INF, self.a, self.b, self.p)
+        return (JacobianPoint.from_affine(self) * n).to_affine()
 
-        elif n == 1:
+    def __rmul__(self, n: int):
+        return self.__mul__(n)
+
+    def get_order_point(self):
+        """
+        Order of the point, it divides the cardinality n of the curve: for each prime q of n,
+        q is removed from the multiple m as long as (m / q) * self is still the infinity point.
+        @return: int
+        """
+        O = self.curve.infinity
+        m = self.curve.cardinality()
+        for q, e in self.curve.cardinality_factors().items():
+            for _ in range(e):
+                if self * (m // q) != O:
+                    break
+                m //= q
+        return m
+
+
+class JacobianPoint:
+    """
+    Point in Jacobian coordinates (X : Y : Z) of the curve y² = x³ + ax + b mod p.
+    It represents the affine point (X/Z², Y/Z³), the point at infinity has Z = 0.
+    Additions and doublings need no modular inversion.
+    """
+
+    __slots__ = ("X", "Y", "Z", "curve")
+
+    def __init__(self, X: int, Y: int, Z: int, curve):
+        self.X, self.Y, self.Z = X, Y, Z
+        self.curve = curve
+
+    @classmethod
+    def from_affine(cls, P: Point):
+        if P.x == INF:
+            return cls(1, 1, 0, P.curve)
+        return cls(P.x, P.y, 1, P.curve)
+
+    def to_affine(self) -> Point:
+        """Convert back to affine coordinates with a single inversion."""
+        if self.Z == 0:
+            return self.curve.infinity
+        p = self.curve.p
+        z_inv = invert(self.Z, p)
+        z_inv2 = z_inv * z_inv % p
+        return Point.unchecked(self.X * z_inv2 % p, self.Y * z_inv2 * z_inv % p, self.curve)
+
+    def is_infinity(self):
+        return self.Z == 0
+
+    def __str__(self):
+        return "∞" if self.Z == 0 else f"({self.X} : {self.Y} : {self.Z})"
+
+    def __eq__(self, Q):
+        if self.Z == 0 or Q.Z == 0:
+            return self.Z == Q.Z
+        p = self.curve.p
+        z1z1, z2z2 = self.Z * self.Z % p, Q.Z * Q.Z % p
+        return (
+            self.X * z2z2 % p == Q.X * z1z1 % p
+            and self.Y * z2z2 * Q.Z % p == Q.Y * z1z1 * self.Z % p
+        )
+
+    def __neg__(self):
+        return JacobianPoint(self.X, -self.Y % self.curve.p, self.Z, self.curve)
+
+    def double(self):
+        """
+        S = 4XY², M = 3X² + aZ⁴
+        X' = M² - 2S, Y' = M(S - X') - 8Y⁴, Z' = 2YZ
+        """
+        X, Y, Z, curve = self.X, self.Y, self.Z, self.curve
+        p = curve.p
+        if Z == 0 or Y == 0:
+            return JacobianPoint(1, 1, 0, curve)
+
+        YY = Y * Y % p
+        S = 4 * X * YY % p
+        ZZ = Z * Z % p
+        M = (3 * X * X + curve.a * ZZ * ZZ) % p
+        X3 = (M * M - 2 * S) % p
+        Y3 = (M * (S - X3) - 8 * YY * YY) % p
+        Z3 = 2 * Y * Z % p
+        return JacobianPoint(X3, Y3, Z3, curve)
+
+    def __add__(self, Q):
+        """
+        U1 = X1Z2², U2 = X2Z1², S1 = Y1Z2³, S2 = Y2Z1³, H = U2 - U1, R = S2 - S1
+        X3 = R² - H³ - 2U1H², Y3 = R(U1H² - X3) - S1H³, Z3 = HZ1Z2
+        """
+        if self.Z == 0:
+            return Q
+        if Q.Z == 0:
             return self
 
-        power, base = Point(INF, INF, self.a, self.b, self.p), self
-        # i = 0
-        while n:
-            # print(f"n: {n}, base: {base}, Point^{i}: {power}")
-            if n & 1:
-                power += base
+        p = self.curve.p
+        X1, Y1, Z1 = self.X, self.Y, self.Z
+        X2, Y2, Z2 = Q.X, Q.Y, Q.Z
+
+        Z1Z1 = Z1 * Z1 % p
+        U2 = X2 * Z1Z1 % p
+        S2 = Y2 * Z1 * Z1Z1 % p
+        if Z2 == 1:
+            # Mixed addition with an affine point
+            U1, S1 = X1, Y1
+        else:
+            Z2Z2 = Z2 * Z2 % p
+            U1 = X1 * Z2Z2 % p
+            S1 = Y1 * Z2 * Z2Z2 % p
+
+        H = (U2 - U1) % p
+        R = (S2 - S1) % p
+        if H == 0:
+            if R == 0:
+                return self.double()
+            return JacobianPoint(1, 1, 0, self.curve)
+
+        HH = H * H % p
+        HHH = H * HH % p
+        V = U1 * HH % p
+        X3 = (R * R - HHH - 2 * V) % p
+        Y3 = (R * (V - X3) - S1 * HHH) % p
+        Z3 = H * Z1 * Z2 % p
+        return JacobianPoint(X3, Y3, Z3, self.curve)
 
-            base += base
-            if base == Point(INF, INF, self.a, self.b, self.p):
-                # print(f"n: {n}, base: {base}, Point^{i}: {power}")
-                return power
+    def __sub__(self, Q):
+        return self + (-Q)
 
-            n >>= 1
-            # i += 1
-        # print(f"n: {n}, base: {base}, Point^{i}: {power}")
-        return power
+    def __mul__(self, n: int):
+        """
+        w-NAF scalar multiplication: the odd multiples P, 3P, ..., (2^(w-1) - 1)P
+        are precomputed, then one doubling per digit and one addition per non-zero digit.
+        """
+        if n < 0:
+            return (-self) * (-n)
+        if n == 0 or self.Z == 0:
+            return JacobianPoint(1, 1, 0, self.curve)
+
+        w = WNAF_WIDTH if n.bit_length() <= 256 else WNAF_WIDTH + 1
+        odd = self._odd_multiples(w)
+
+        result = JacobianPoint(1, 1, 0, self.curve)
+        for d in reversed(wnaf(n, w)):
+            result = result.double()
+            if d > 0:
+                result = result + odd[d >> 1]
+            elif d < 0:
+                result = result - odd[-d >> 1]
+        return result
 
     def __rmul__(self, n: int):
         return self.__mul__(n)
 
-    def get_order_point(self):
-        O = Point(INF, INF, self.a, self.b, self.p)
-        Q = self
+    def _odd_multiples(self, w: int):
+        twice = self.double()
+        odd = [self]
+        for _ in range((1 << (w - 2)) - 1):
+            odd.append(odd[-1] + twice)
+        return odd
+
+    def odd_multiples(self, w: int = WNAF_WIDTH):
+        """
+        P, 3P, ..., (2^(w-1) - 1)P normalized to Z = 1 (mixed additions),
+        table of multi_scalar_mul to keep when P is multiplied many times.
+        """
+        return [JacobianPoint.from_affine(Q) for Q in batch_to_affine(self._odd_multiples(w))]
+
+
+def batch_to_affine(points) -> list:
+    """
+    Affine coordinates of many Jacobian points with a single inversion (batch_invert).
+    @param points: list of JacobianPoint of the same curve.
+    @return: list of Point
+    """
+    if not points:
+        return []
+    curve = points[0].curve
+    p = curve.p
+    finite = [J for J in points if J.Z != 0]
+    z_inv = iter(batch_invert([J.Z for J in finite], p))
+
+    affine = []
+    for J in points:
+        if J.Z == 0:
+            affine.append(curve.infinity)
+        else:
+            z = next(z_inv)
+            zz = z * z % p
+            affine.append(Point.unchecked(J.X * zz % p, J.Y * zz * z % p, curve))
+    return affine
+
+
+def multi_scalar_mul(terms) -> JacobianPoint:
+    """
+    k1 * P1 + k2 * P2 + ... for the pairs (k, P.odd_multiples(w)) of terms, k >= 0.
+    The scalars share a single chain of doublings (Straus-Shamir trick) and each
+    adds its own w-NAF digits, w being given by the size of its table.
+    """
+    digits = [(wnaf(k, len(odd).bit_length() + 1), odd) for k, odd in terms]
+    result = JacobianPoint(1, 1, 0, terms[0][1][0].curve)
+    for i in range(max(len(d) for d, _ in digits) - 1, -1, -1):
+        result = result.double()
+        for d, odd in digits:
+            if i < len(d) and d[i]:
+                if d[i] > 0:
+                    result = result + odd[d[i] >> 1]
+                else:
+                    result = result - odd[-d[i] >> 1]
+    return result
+
+
+class FixedBase:
+    """
+    Precomputed table for a base point P which is multiplied many times (generator
+    of a signature scheme, public parameter of a key...).
+    table[i][j] = j * 2^(w*i) * P in affine coordinates, so that
+    k * P = sum of table[i][k_i] where k_i are the base 2^w digits of k:
+    only mixed additions, no doubling.
+    """
+
+    def __init__(self, P: Point, bits: int = None, w: int = FIXED_BASE_WIDTH):
+        self.P = P
+        self.w = w
+        # Every point order is at most p + 1 + 2√p < 2p
+        self.bits = bits or P.p.bit_length() + 1
+        self.table = []
+
+        if P.x == INF:
+            return
+
+        # All the rows are normalized together
+        rows = []
+        base = JacobianPoint.from_affine(P)
+        for _ in range(-(-self.bits // w)):
+            row = [base]
+            for _ in range((1 << w) - 2):
+                row.append(row[-1] + base)
+            rows.append(row)
+            for _ in range(w):
+                base = base.double()
+
+        affine = iter(batch_to_affine([Q for row in rows for Q in row]))
+        for row in rows:
+            self.table.append([None] + [JacobianPoint.from_affine(next(affine)) for _ in row])
+
+    def multiply_jacobian(self, k: int) -> JacobianPoint:
+        if k < 0:
+            return -self.multiply_jacobian(-k)
+        if k.bit_length() > self.bits or self.P.x == INF:
+            return JacobianPoint.from_affine(self.P) * k
+
+        result = JacobianPoint(1, 1, 0, self.P.curve)
+        mask = (1 << self.w) - 1
+        i = 0
+        while k:
+            digit = k & mask
+            if digit:
+                result = result + self.table[i][digit]
+            k >>= self.w
+            i += 1
+        return result
+
+    def __mul__(self, k: int) -> Point:
+        return self.multiply_jacobian(k).to_affine()
+
+    def __rmul__(self, k: int) -> Point:
+        return self.__mul__(k)
+
+
+_FIXED_BASES = {}
+
+
+def fixed_base(P: Point, bits: int = None) -> FixedBase:
+    """
+    Cached FixedBase of the point P.
+    @param bits: bit length of the scalars (by default large enough for any scalar below the order).
+    """
+    key = (P.x, P.y, P.curve, bits)
+    if key not in _FIXED_BASES:
+        _FIXED_BASES[key] = FixedBase(P, bits)
+    return _FIXED_BASES[key]
+
+
+def _marker_size(n: int) -> float:
+    """Scatter marker area, smaller as the number of points grows so large curves stay readable."""
+    return float(np.clip(2e4 / max(n, 1), 0.1, 20))
 
-        n = 1
-        while Q != O:
-            Q += 2 * self
-            n += 2
-        return n
+
+def save_plots(curves, paths, dpi: int = 100) -> list:
+    """
+    Render curves to image files without a display: the figures are created with
+    matplotlib.figure.Figure (Agg canvas), never registered in pyplot, so nothing has to be closed.
+    The point arrays computed for a figure are dropped after it is saved (the cardinality
+    is kept), so rendering many curves does not accumulate them.\n
+    @param curves: Iterable of Curve.
+    @param paths: Output file of each curve, the format is given by the extension.
+    @param dpi: Resolution of the images.
+    @return: list of the written paths.
+    """
+    written = []
+    for curve, path in zip(curves, paths):
+        cached = curve._points is not None
+        fig = Figure(figsize=(12, 5))
+        curve.draw(fig)
+        fig.savefig(path, dpi=dpi)
+        # The point arrays computed here are dropped, and the figure (a reference cycle holding
+        # copies of the coordinates) is collected now instead of piling up between collections
+        if not cached:
+            curve._points = None
+        del fig
+        gc.collect()
+        written.append(path)
+    return written
 
 
 class Curve:
@@ -152,58 +486,166 @@ class Curve:
     p is the prime number different from 2 and 3.
     """
 
-    def __init__(self, a, b, p=5):
-        self.a = a
-        self.b = b
-        if isprime(p):
-            self.p = p
-        else:
+    # Curves are shared: Curve(a, b, p) always returns the same object for the same parameters
+    # as long as it is referenced (points, tables...), then it is freed with its cached data.
+    _instances = WeakValueDictionary()
+
+    def __new__(cls, a, b, p=5):
+        if p < 2:
             raise ValueError("p must be a prime number")
+        # a and b are stored reduced mod p: Curve(p - 3, b, p) is Curve(-3, b, p)
+        key = (a % p, b % p, p)
+        curve = cls._instances.get(key)
+        if curve is None:
+            if not isprime(p):
+                raise ValueError("p must be a prime number")
+            curve = super().__new__(cls)
+            curve.a, curve.b, curve.p = key
+            # Identity element of the group, shared by all the points of the curve
+            curve.infinity = Point.unchecked(INF, INF, curve)
+            curve._cardinality = None
+            curve._factors = None
+            curve._points = None
+            cls._instances[key] = curve
+        return curve
+
+    def __reduce__(self):
+        # Unpickled curves (process pools) are interned again
+        return Curve, (self.a, self.b, self.p)
+
+    def point(self, x: int, y: int) -> Point:
+        """Point (x, y) of the curve, checked to be on it."""
+        if not self.onCuve(x, y):
+            raise ValueError("Point is not on the curve")
+        return Point.unchecked(x, y, self)
 
     def onCuve(self, x, y):
         return pow(weierstrass(x, y, self.a, self.b), 1, self.p) == 0
 
+    def iter_points(self):
+        """
+        Generate the points of the curve, the infinity point first then by increasing x and y.
+        For each x, x^3 + ax + b gives 0, 1 or 2 points depending on its Legendre symbol,
+        the y-coordinates are taken by Tonelli-Shanks: O(p log p).
+        """
+        yield self.infinity
+        a, b, p = self.a, self.b, self.p
+        for x in range(p):
+            rhs = (x**3 + a * x + b) % p
+            if rhs == 0:
+                yield Point.unchecked(x, 0, self)
+            elif legendre(rhs, p) == 1:
+                y = sqrt_mod(rhs, p)
+                y = min(y, p - y)
+                yield Point.unchecked(x, y, self)
+                yield Point.unchecked(x, p - y, self)
+
     def get_points(self):
         """Get points on the curve."""
-        points = [Point(INF, INF, self.a, self.b, self.p)]
-        space = [i for i in range(self.p)]
+        return list(self.iter_points())
 
-        for x in space:
-            for y in space:
-                if self.onCuve(x, y):
-                    points.append(Point(x, y, self.a, self.b, self.p))
-        return points
+    def points_array(self):
+        """
+        Coordinates of the affine points as two NumPy arrays (xs, ys), ordered as iter_points.
+        Every x is evaluated at once, the square roots come from a table of the squares mod p.
+        The arrays are computed once per curve and also give its cardinality.
+        Requires p < 2^31 so that the products fit in int64.
+        """
+        if self._points is None:
+            self._points = self._compute_points_array()
+            if self._cardinality is None:
+                self._cardinality = len(self._points[0]) + 1
+        return self._points
+
+    def _compute_points_array(self):
+        p = self.p
+        if p >= 1 << 31:
+            raise ValueError("points_array requires p < 2^31")
+
+        x = np.arange(p, dtype=np.int64)
+        rhs = (x * x % p * x + self.a % p * x + self.b % p) % p
+
+        # roots[v] = smallest y with y^2 = v mod p, -1 if v is not a square
+        roots = np.full(p, -1, dtype=np.int64)
+        y = np.arange((p + 1) // 2, dtype=np.int64)
+        roots[y * y % p] = y
+
+        y = roots[rhs]
+        xs = x[y >= 0]
+        ys = y[y >= 0]
+        twice = ys != 0
+        xs = np.concatenate([xs, xs[twice]])
+        ys = np.concatenate([ys, p - ys[twice]])
+        order = np.lexsort((ys, xs))
+        return xs[order], ys[order]
 
     def cardinality(self):
-        """Get the number of points on the curve. The infinity point is also counted."""
-        return len(self.get_points())
-
-    def plotCurve(self):
-        """Plot the elliptic curve with two subplots: real numbers and modular points."""
-        points = self.get_points()
+        """
+        Get the number of points on the curve. The infinity point is also counted.
+        Computed once by point counting (Legendre symbols, baby-step giant-step or Schoof, see point_counting.py).
+        """
+        if self._cardinality is None:
+            self._cardinality = count_points(self.a, self.b, self.p)
+        return self._cardinality
+
+    def set_cardinality(self, cardinality: int, factors: dict = None):
+        """Record a known cardinality (standard curves) instead of counting the points."""
+        self._cardinality = cardinality
+        self._factors = factors
+
+    def cardinality_factors(self):
+        """Factorization {q: e} of the cardinality, computed once."""
+        if self._factors is None:
+            self._factors = factorint(self.cardinality())
+        return self._factors
+
+    def random_point(self):
+        """Uniform choice of x until x^3 + ax + b is a square, then a random sign for y."""
+        a, b, p = self.a, self.b, self.p
+        while True:
+            x = randint(0, p - 1)
+            rhs = (x**3 + a * x + b) % p
+            if legendre(rhs, p) >= 0:
+                y = sqrt_mod(rhs, p)
+                return Point.unchecked(x, y if randint(0, 1) else (p - y) % p, self)
+
+    def draw(self, fig, window: float = 5):
+        """
+        Draw the curve on a Matplotlib figure with two subplots: real numbers and modular points.
+        The modular points come from the cached points_array, the real curve from the grid
+        shared with illustrastions.py.
+        """
+        x_points, y_points = self.points_array()
         n = self.cardinality()
-
-        x_points = [point.x for point in points]
-        y_points = [point.y for point in points]
-
-        fig, axes = plt.subplots(1, 2, figsize=(12, 5))
-
-        # **First Subplot: Real Elliptic Curve**
-        window = 5
-        y, x = np.ogrid[-window:window:100j, -window:window:100j]
-        axes[0].contour(x.ravel(), y.ravel(), weierstrass(x, y, self.a, self.b), [0])
-        axes[0].set_title(rf"$y^2 = x^3 + {self.a}x + {self.b}$ (Real Numbers)")
+        axes = fig.subplots(1, 2)
+
+        # **First Subplot: Real Elliptic Curve**, with the representatives of a and b in (-p/2, p/2]
+        a = self.a - self.p if self.a > self.p // 2 else self.a
+        b = self.b - self.p if self.b > self.p // 2 else self.b
+        x, y = grid(window, 100j)
+        axes[0].contour(x.ravel(), y.ravel(), weierstrass(x, y, a, b), [0])
+        axes[0].set_title(rf"$y^2 = x^3 + {a}x + {b}$ (Real Numbers)")
         axes[0].grid()
 
         # **Second Subplot: Modular Elliptic Curve**
-        axes[1].scatter(x_points, y_points, color="blue")
+        axes[1].scatter(x_points, y_points, s=_marker_size(len(x_points)), color="blue")
         axes[1].set_title(
-            rf"$y^2 \equiv x^3$ + {a}x + {b} [{p}]" + f"\nCardinality : {n}"
+            rf"$y^2 \equiv x^3$ + {self.a}x + {self.b} [{self.p}]" + f"\nCardinality : {n}"
         )
         axes[1].grid()
+        fig.tight_layout()
 
-        plt.tight_layout()
-        plt.show()
+    def plotCurve(self, path: str = None):
+        """
+        Plot the elliptic curve with two subplots: real numbers and modular points.
+        @param path: If given, the figure is saved to this file (PNG...) instead of being shown.
+        """
+        if path is None:
+            fig = plt.figure(figsize=(12, 5))
+            self.draw(fig)
+            plt.show()
+        else:
+            save_plots([self], [path])
 
     def __str__(self):
         points = self.get_points()
@@ -211,18 +653,19 @@ class Curve:
         return f"Curve: y^2 = x^3 + {self.a}x + {self.b} [{self.p}]\n\n#E(Fp) : {self.cardinality()}\nPoints : {list_points}"
 
     def get_prime_order(self):
-        points = self.get_points()
+        """
+        Generator of the subgroup of largest prime order q: h * P with h = #E / q the cofactor
+        and P a random point, as soon as it is not the infinity point.
+        @return: (q, point)
+        """
         cardinality = self.cardinality()
+        q = max(self.cardinality_factors())
+        cofactor = cardinality // q
 
-        rand = lambda: randint(0, cardinality - 1)
-
-        i = rand()
-        point = points[i]
-        while not isprime(point.get_order_point()):
-            i = rand()
-            point = points[i]
-        return point.get_order_point(), point
-
+        point = self.random_point() * cofactor
+        while point == self.infinity:
+            point = self.random_point() * cofactor
+        return q, point
 
 if __name__ == "__main__":
     a, b, p = -3, 1, 1217
@@ -0,0 +1,190 @@
+"""
+Throughput benchmark of the AES implementations.
+
+Measures MB/s and per-block latency of:
+- primitives.encrypt/decrypt (reference and T-table engines) for 128/192/256-bit keys,
+- the round.AES steps,
+- the native modes (modes.py), the bitsliced and the NumPy engines,
+- every authenticated_AES mode for payloads from 16 B to 64 MB.
+
+Results are written as JSON so that runs can be compared across releases:
+    python aes_bench.py --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "src", "aes"), os.path.join(ROOT, "src", "mode")]
+
+import primitives
+import modes
+import bitslice
+import vectorized
+from round import AES as RoundAES
+from operation import authenticated_AES
+
+BLOCK_SIZE = 16
+KEY_SIZES = ("128", "192", "256")
+AEAD_SIZES = [16, 256, 4 << 10, 64 << 10, 1 << 20, 16 << 20, 64 << 20]
+NATIVE_SIZES = [16, 256, 4 << 10, 64 << 10]
+AEAD_NONCE_SIZES = {"CCM": 13, "EAX": 16, "GCM": 12, "OCB": 15, "SIV": 16}
+MIN_TIME = 0.2
+
+
+def measure(fn, repeat, min_time=MIN_TIME):
+    """
+    Runs fn until `min_time` seconds have elapsed, `repeat` times.
+    @return: best and median time of one call, in seconds.
+    """
+    fn()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    timings = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        timings.append((time.perf_counter() - start) / loops)
+    return min(timings), statistics.median(timings)
+
+
+def record(group, name, size, best, median, **extra):
+    blocks = max(1, -(-size // BLOCK_SIZE))
+    return {
+        "group": group,
+        "name": name,
+        "bytes": size,
+        "best_s": best,
+        "median_s": median,
+        "mb_per_s": size / best / 1e6,
+        "ns_per_block": best / blocks * 1e9,
+        **extra,
+    }
+
+
+def bench_primitives(repeat, min_time):
+    results = []
+    block = os.urandom(BLOCK_SIZE)
+    for size in KEY_SIZES:
+        key = os.urandom(int(size) // 8)
+        for engine in primitives.ENGINES:
+            for name, fn in (("encrypt", primitives.encrypt), ("decrypt", primitives.decrypt)):
+                best, median = measure(lambda: fn(key, block, size, engine=engine), repeat, min_time)
+                results.append(record("primitives", name, BLOCK_SIZE, best, median, key_bits=int(size), engine=engine))
+    return results
+
+
+def bench_round(repeat, min_time):
+    results = []
+    state = os.urandom(BLOCK_SIZE).hex()
+    aes = RoundAES(state)
+    for step in ("SubBytes", "ShiftRow", "MixColumn"):
+        fn = getattr(aes, step)
+        best, median = measure(fn, repeat, min_time)
+        results.append(record("round.AES", step, BLOCK_SIZE, best, median))
+    return results
+
+
+def bench_native(repeat, min_time, sizes):
+    results = []
+    for size in KEY_SIZES:
+        key = primitives.AESKey(os.urandom(int(size) // 8))
+        for n in sizes:
+            data = os.urandom(n)
+            out = bytearray(n)
+            nonce = os.urandom(8)
+            cases = [
+                ("ctr", lambda: modes.ctr_encrypt(key, nonce, data, out=out)),
+                ("gcm", lambda: modes.gcm_encrypt(key, nonce + b"\x00" * 4, data, out=out)),
+                ("numpy_ctr", lambda: vectorized.ctr_encrypt(key, nonce, data)),
+            ]
+            if n % BLOCK_SIZE == 0:
+                blocks = [data[i:i+BLOCK_SIZE] for i in range(0, n, BLOCK_SIZE)]
+                cases += [
+                    ("ecb", lambda: modes.ecb_encrypt(key, data, out=out)),
+                    ("cbc", lambda: modes.cbc_encrypt(key, nonce * 2, data, out=out)),
+                    ("bitslice_ecb", lambda: bitslice.encrypt_blocks(key, blocks)),
+                    ("numpy_ecb", lambda: vectorized.ecb_encrypt(key, data)),
+                ]
+            for name, fn in cases:
+                best, median = measure(fn, repeat, min_time)
+                results.append(record("native", name, n, best, median, key_bits=int(size)))
+    return results
+
+
+def bench_aead(repeat, min_time, sizes):
+    results = []
+    for size in KEY_SIZES:
+        for mode, nonce_size in AEAD_NONCE_SIZES.items():
+            key = os.urandom(2 * int(size) // 8 if mode == "SIV" else int(size) // 8)
+            aes = authenticated_AES(key, mode, os.urandom(nonce_size))
+            associated_data = os.urandom(16)
+            for n in sizes:
+                data = os.urandom(n)
+                best, median = measure(lambda: aes.encrypt(data, associated_data), repeat, min_time)
+                results.append(record("authenticated_AES", f"{mode}.encrypt", n, best, median, key_bits=int(size)))
+
+                ciphertext, tag = aes.encrypt(data, associated_data)
+                best, median = measure(lambda: aes.decrypt(ciphertext, tag, associated_data), repeat, min_time)
+                results.append(record("authenticated_AES", f"{mode}.decrypt", n, best, median, key_bits=int(size)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", "-o", help="JSON output file (default: stdout)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="minimum duration of a timed run, in seconds")
+    parser.add_argument("--max-size", type=int, default=max(AEAD_SIZES), help="largest AEAD payload")
+    parser.add_argument("--max-native-size", type=int, default=max(NATIVE_SIZES), help="largest payload of the pure Python modes")
+    parser.add_argument(
+        "--groups", nargs="+", default=["primitives", "round", "native", "aead"],
+        choices=["primitives", "round", "native", "aead"],
+    )
+    args = parser.parse_args()
+
+    results = []
+    if "primitives" in args.groups:
+        results += bench_primitives(args.repeat, args.min_time)
+    if "round" in args.groups:
+        results += bench_round(args.repeat, args.min_time)
+    if "native" in args.groups:
+        results += bench_native(args.repeat, args.min_time, [n for n in NATIVE_SIZES if n <= args.max_native_size])
+    if "aead" in args.groups:
+        results += bench_aead(args.repeat, args.min_time, [n for n in AEAD_SIZES if n <= args.max_size])
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "repeat": args.repeat,
+            "min_time": args.min_time,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Bitsliced AES: N independent blocks are encrypted at once.
+
+The state is stored as 8 Python integers, one per bit of a byte (bit planes).
+Bit p*N + j of plane b is the bit b of the byte p of the block j, so every
+boolean operation on the planes processes the 16 bytes of the N blocks.
+SubBytes is evaluated as a boolean circuit (inversion in GF(2^8) followed by
+the affine transformation), ShiftRows and MixColumns become shifts of the planes
+by multiples of N bits.
+"""
+from primitives import AESKey, get_key, s_box, xtime
+
+BLOCK_SIZE = 16
+BATCH_SIZE = 4096
+
+# Bit b of a byte, as an ASCII digit, and back.
+_TO_DIGIT = [bytes(0x31 if (x >> b) & 1 else 0x30 for x in range(256)) for b in range(8)]
+_FROM_DIGIT = [bytes((1 << b) if x == 0x31 else 0 for x in range(256)) for b in range(8)]
+
+
+# Linear maps of GF(2^8): output bit k is the XOR of the input bits listed in row k.
+def _linear_rows(f):
+    """ Rows of the GF(2)-linear map f: GF(2^8) -> GF(2^8).  """
+    images = [f(1 << i) for i in range(8)]
+    return [[i for i in range(8) if (images[i] >> k) & 1] for k in range(8)]
+
+def _square(a):
+    """ a^2 in GF(2^8).  """
+    p, b = 0, a
+    while b:
+        if b & 1:
+            p ^= a
+        a = xtime(a)
+        b >>= 1
+    return p
+
+def _power_of_2(k):
+    def f(a):
+        for _ in range(k):
+            a = _square(a)
+        return a
+    return f
+
+_SQUARE = _linear_rows(_power_of_2(1))
+_POW4 = _linear_rows(_power_of_2(2))
+_POW16 = _linear_rows(_power_of_2(4))
+
+def _linear(x, rows):
+    out = []
+    for row in rows:
+        v = 0
+        for i in row:
+            v ^= x[i]
+        out.append(v)
+    return out
+
+
+# Circuits on bit planes
+def _mul(a, b):
+    """ Bitsliced multiplication in GF(2^8) modulo x^8 + x^4 + x^3 + x + 1.  """
+    c = [0] * 15
+    for i in range(8):
+        ai = a[i]
+        for j in range(8):
+            c[i + j] ^= ai & b[j]
+    for k in range(14, 7, -1):
+        ck = c[k]
+        c[k - 4] ^= ck
+        c[k - 5] ^= ck
+        c[k - 7] ^= ck
+        c[k - 8] ^= ck
+    return c[:8]
+
+def _sub_bytes(x, ones):
+    """ S(x) = A.x^254 + 0x63, where x^254 is the inverse of x (and 0 for 0).  """
+    x2 = _linear(x, _SQUARE)
+    x3 = _mul(x2, x)
+    x12 = _linear(x3, _POW4)
+    x15 = _mul(x12, x3)
+    x240 = _linear(x15, _POW16)
+    x252 = _mul(x240, x12)
+    y = _mul(x252, x2)
+
+    out = []
+    for i in range(8):
+        v = y[i] ^ y[(i + 4) % 8] ^ y[(i + 5) % 8] ^ y[(i + 6) % 8] ^ y[(i + 7) % 8]
+        if (0x63 >> i) & 1:
+            v ^= ones
+        out.append(v)
+    return out
+
+def _xtime(x):
+    """ Bitsliced multiplication by 2 in GF(2^8).  """
+    h = x[7]
+    return [h, x[0] ^ h, x[1], x[2] ^ h, x[3] ^ h, x[4], x[5], x[6]]
+
+
+class _Layout:
+    """ Masks and shifts of the bit planes for a batch of N blocks.  """
+
+    def __init__(self, n):
+        self.n = n
+        self.chunk = (1 << n) - 1
+        self.ones = (1 << (BLOCK_SIZE * n)) - 1
+
+        def mask(positions):
+            m = 0
+            for p in positions:
+                m |= self.chunk << (p * n)
+            return m
+
+        # Byte p of the state is at row p % 4 and column p // 4.
+        # ShiftRows: new[r, c] = old[r, (c + r) % 4]
+        self.shift_rows = []
+        for r in range(4):
+            low = mask(4*c + r for c in range(4 - r))
+            high = mask(4*c + r for c in range(4 - r, 4))
+            self.shift_rows.append((4 * r * n, low, (16 - 4 * r) * n, high))
+
+        # Rotation of the rows inside a column: new[r, c] = old[(r + k) % 4, c]
+        self.rotations = {}
+        for k in (1, 2):
+            low = mask(4*c + r for c in range(4) for r in range(4 - k))
+            high = mask(4*c + r for c in range(4) for r in range(4 - k, 4))
+            self.rotations[k] = (k * n, low, (4 - k) * n, high)
+
+    def shift(self, x, right, low, left, high):
+        return ((x >> right) & low) | ((x << left) & high)
+
+    def shift_rows_plane(self, x):
+        v = x & self.shift_rows[0][1]
+        for right, low, left, high in self.shift_rows[1:]:
+            v |= self.shift(x, right, low, left, high)
+        return v
+
+    def rotate(self, x, k):
+        return self.shift(x, *self.rotations[k])
+
+    def mix_columns(self, planes):
+        # a'[r] = 2(a[r] ^ a[r+1]) ^ a[r+1] ^ a[r+2] ^ a[r+3]
+        r1 = [self.rotate(x, 1) for x in planes]
+        s = [a ^ b for a, b in zip(planes, r1)]
+        s2 = _xtime(s)
+        return [s2[i] ^ r1[i] ^ self.rotate(s[i], 2) for i in range(8)]
+
+    def round_key(self, rk):
+        """ Spreads the 16 bytes of a round key over the N blocks.  """
+        planes = [0] * 8
+        for p, byte in enumerate(rk):
+            for b in range(8):
+                if (byte >> b) & 1:
+                    planes[b] |= self.chunk << (p * self.n)
+        return planes
+
+    def pack(self, data):
+        """ Transposes the N blocks of `data` into 8 bit planes.  """
+        planes = [0] * 8
+        for p in range(BLOCK_SIZE):
+            column = data[p::BLOCK_SIZE]
+            for b in range(8):
+                planes[b] |= int(column.translate(_TO_DIGIT[b])[::-1], 2) << (p * self.n)
+        return planes
+
+    def unpack(self, planes):
+        """ Inverse of pack.  """
+        n = self.n
+        out = bytearray(BLOCK_SIZE * n)
+        for p in range(BLOCK_SIZE):
+            column = 0
+            for b in range(8):
+                digits = format((planes[b] >> (p * n)) & self.chunk, f"0{n}b")[::-1]
+                column += int.from_bytes(digits.encode().translate(_FROM_DIGIT[b]), "big")
+            out[p::BLOCK_SIZE] = column.to_bytes(n, "big")
+        return out
+
+
+def _encrypt_batch(key, data):
+    n = len(data) // BLOCK_SIZE
+    layout = _Layout(n)
+    round_keys = [
+        layout.round_key(b"".join(w.to_bytes(4, "big") for w in key.ek[4*r : 4*r + 4]))
+        for r in range(key.nr + 1)
+    ]
+
+    state = [x ^ k for x, k in zip(layout.pack(data), round_keys[0])]
+    for r in range(1, key.nr + 1):
+        state = _sub_bytes(state, layout.ones)
+        state = [layout.shift_rows_plane(x) for x in state]
+        if r != key.nr:
+            state = layout.mix_columns(state)
+        state = [x ^ k for x, k in zip(state, round_keys[r])]
+    return layout.unpack(state)
+
+
+def encrypt_blocks(key, blocks, batch_size=BATCH_SIZE):
+    """
+    Encrypts a list of independent 16-byte blocks under the same key.
+    Blocks are processed `batch_size` at a time by the bitsliced rounds.
+    @param key: AESKey or master key bytes.
+    @param blocks: list of 16-byte blocks.
+    @return: list of 16-byte ciphertext blocks.
+    """
+    key = key if isinstance(key, AESKey) else get_key(key, len(key) * 8)
+    if not all(len(block) == BLOCK_SIZE for block in blocks):
+        raise ValueError("Blocks must be 16 bytes long")
+    data = b"".join(blocks)
+
+    out = []
+    step = BLOCK_SIZE * batch_size
+    for i in range(0, len(data), step):
+        ciphertext = _encrypt_batch(key, data[i:i+step])
+        out.extend(bytes(ciphertext[j:j+BLOCK_SIZE]) for j in range(0, len(ciphertext), BLOCK_SIZE))
+    return out
+
+
+if __name__ == "__main__":
+    from os import urandom
+
+    # The circuit computes the S-box
+    layout = _Layout(256)
+    planes = layout.pack(bytes(x for x in range(256) for _ in range(BLOCK_SIZE)))
+    assert bytes(layout.unpack(_sub_bytes(planes, layout.ones))[::BLOCK_SIZE]) == bytes(s_box)
+
+    for size in ("128", "192", "256"):
+        key = AESKey(urandom(int(size) // 8))
+        blocks = [urandom(BLOCK_SIZE) for _ in range(300)]
+        assert encrypt_blocks(key, blocks, batch_size=128) == [key.encrypt(b) for b in blocks]
+
+    # FIPS-197 Appendix C.1
+    key = bytes(range(16))
+    plaintext = bytes.fromhex("00112233445566778899aabbccddeeff")
+    print(encrypt_blocks(key, [plaintext])[0].hex())
@@ -74,3 +74,25 @@ if __name__ == "__main__":
     key        = b'rijndaelrijndaelrijndaelrijndael'
     ciphertext = b"\xee\xcfI\x1e-\xc9\xd7-=u\xc4\x8cF\xd56t"
     assert decrypt(key,encrypt(key, plaintext, size="256"),size="256") == plaintext
+
+
+    # Test T-table engine against the reference engine (FIPS-197 Appendix C.1)
+    key        = bytes(range(16))
+    plaintext  = bytes.fromhex("00112233445566778899aabbccddeeff")
+    ciphertext = bytes.fromhex("69c4e0d86a7b0430d8cdb78070b4c55a")
+    assert encrypt(key, plaintext, size="128", engine="ttable") == ciphertext
+    assert encrypt(key, plaintext, size="128", engine="reference") == ciphertext
+    assert decrypt(key, ciphertext, size="128", engine="ttable") == plaintext
+
+    for size in ("128", "192", "256"):
+        key = b'rijndael' * (int(size) // 64)
+        plaintext = b'crypto{MYAES128}'
+        ciphertext = encrypt(key, plaintext, size=size)
+        assert encrypt(key, plaintext, size=size, engine="ttable") == ciphertext
+        assert decrypt(key, ciphertext, size=size, engine="ttable") == plaintext
+
+    # Test AESKey: the key schedule is expanded once and reused for every block
+    aes_key = AESKey(b'rijndaelrijndael')
+    assert aes_key.decrypt(aes_key.encrypt(b'crypto{MYAES128}')) == b'crypto{MYAES128}'
+    assert aes_key.encrypt(b'crypto{MYAES128}') == encrypt(b'rijndaelrijndael', b'crypto{MYAES128}')
+    assert get_key(b'rijndaelrijndael') is get_key(b'rijndaelrijndael')
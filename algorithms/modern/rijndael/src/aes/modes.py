@@ -0,0 +1,362 @@
+import hmac
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from primitives import AESKey, get_key
+
+BLOCK_SIZE = 16
+# Tag lengths allowed by SP 800-38D (section 5.2.1.2), in bytes
+GCM_TAG_LENGTHS = (12, 13, 14, 15, 16)
+
+
+def _as_key(key):
+    """ Accepts either an AESKey or raw key bytes.  """
+    return key if isinstance(key, AESKey) else get_key(key, len(key) * 8)
+
+def _output(out, length):
+    """ Returns the preallocated output buffer, or allocates one.  """
+    if out is None:
+        return bytearray(length)
+    if len(out) < length:
+        raise ValueError("Output buffer is too small")
+    return out
+
+def _check_aligned(data):
+    if len(data) % BLOCK_SIZE:
+        raise ValueError("Data must be aligned to the block size (16 bytes)")
+
+def _check_iv(iv):
+    if len(iv) != BLOCK_SIZE:
+        raise ValueError("IV must be 16 bytes long")
+
+
+# ECB: each block is encrypted independently.
+def ecb_encrypt(key, plaintext, out=None):
+    key = _as_key(key)
+    data = memoryview(plaintext).cast("B")
+    _check_aligned(data)
+    out = _output(out, len(data))
+
+    for i in range(0, len(data), BLOCK_SIZE):
+        out[i:i+BLOCK_SIZE] = key.encrypt(data[i:i+BLOCK_SIZE])
+    return out
+
+def ecb_decrypt(key, ciphertext, out=None):
+    key = _as_key(key)
+    data = memoryview(ciphertext).cast("B")
+    _check_aligned(data)
+    out = _output(out, len(data))
+
+    for i in range(0, len(data), BLOCK_SIZE):
+        out[i:i+BLOCK_SIZE] = key.decrypt(data[i:i+BLOCK_SIZE])
+    return out
+
+
+# CBC: C[i] = E(P[i] ^ C[i-1]) with C[-1] = IV.
+def cbc_encrypt(key, iv, plaintext, out=None):
+    key = _as_key(key)
+    data = memoryview(plaintext).cast("B")
+    _check_aligned(data)
+    _check_iv(iv)
+    out = _output(out, len(data))
+
+    previous = int.from_bytes(iv, "big")
+    for i in range(0, len(data), BLOCK_SIZE):
+        block = (int.from_bytes(data[i:i+BLOCK_SIZE], "big") ^ previous).to_bytes(BLOCK_SIZE, "big")
+        block = key.encrypt(block)
+        out[i:i+BLOCK_SIZE] = block
+        previous = int.from_bytes(block, "big")
+    return out
+
+def cbc_decrypt(key, iv, ciphertext, out=None):
+    key = _as_key(key)
+    data = memoryview(ciphertext).cast("B")
+    _check_aligned(data)
+    _check_iv(iv)
+    out = _output(out, len(data))
+
+    previous = int.from_bytes(iv, "big")
+    for i in range(0, len(data), BLOCK_SIZE):
+        block = data[i:i+BLOCK_SIZE]
+        current = int.from_bytes(block, "big")
+        out[i:i+BLOCK_SIZE] = (int.from_bytes(key.decrypt(block), "big") ^ previous).to_bytes(BLOCK_SIZE, "big")
+        previous = current
+    return out
+
+
+# CTR: the keystream is E(nonce || counter), the counter is big endian.
+def _ctr_xor(key, counter_block, data, out, offset=0, counter_bits=128):
+    """
+    XORs `data` with the keystream starting at the integer `counter_block`
+    and writes the result in out[offset:]. Only the `counter_bits` low bits are incremented.
+    """
+    mask = (1 << counter_bits) - 1
+    prefix = counter_block & ~mask & ((1 << 128) - 1)
+    counter = counter_block & mask
+
+    n = len(data)
+    full = n - n % BLOCK_SIZE
+    for i in range(0, full, BLOCK_SIZE):
+        keystream = key.encrypt((prefix | counter).to_bytes(BLOCK_SIZE, "big"))
+        block = int.from_bytes(data[i:i+BLOCK_SIZE], "big") ^ int.from_bytes(keystream, "big")
+        out[offset+i:offset+i+BLOCK_SIZE] = block.to_bytes(BLOCK_SIZE, "big")
+        counter = (counter + 1) & mask
+
+    if full < n:
+        keystream = key.encrypt((prefix | counter).to_bytes(BLOCK_SIZE, "big"))
+        out[offset+full:offset+n] = bytes(a ^ b for a, b in zip(data[full:], keystream))
+        counter = (counter + 1) & mask
+    return prefix | counter
+
+def ctr_block(nonce, initial_value=0):
+    """ Returns the first counter block nonce || initial_value as an integer.  """
+    if len(nonce) >= BLOCK_SIZE:
+        raise ValueError("Nonce must be shorter than the block size")
+    counter_len = BLOCK_SIZE - len(nonce)
+    return int.from_bytes(bytes(nonce) + initial_value.to_bytes(counter_len, "big"), "big")
+
+def ctr_encrypt(key, nonce, data, out=None, initial_value=0):
+    """
+    The counter occupies the 16 - len(nonce) last bytes of the counter block,
+    same convention as Crypto.Cipher.AES.MODE_CTR.
+    """
+    key = _as_key(key)
+    data = memoryview(data).cast("B")
+    out = _output(out, len(data))
+    _ctr_xor(key, ctr_block(nonce, initial_value), data, out, counter_bits=8 * (BLOCK_SIZE - len(nonce)))
+    return out
+
+ctr_decrypt = ctr_encrypt
+
+
+# GCM: CTR encryption + GHASH authentication over GF(2^128) (NIST SP 800-38D).
+R = 0xE1 << 120
+
+def gf128_mul(x, y):
+    """ Multiplies two elements of GF(2^128) with the GCM bit ordering.  """
+    z = 0
+    v = y
+    for i in range(127, -1, -1):
+        if (x >> i) & 1:
+            z ^= v
+        v = (v >> 1) ^ R if v & 1 else v >> 1
+    return z
+
+
+class GHASH:
+    """
+    GHASH with the hash subkey H.
+    X.H is linear in X, so it is precomputed for every byte value at every
+    byte position: a multiplication is 16 table lookups.
+    """
+
+    def __init__(self, h):
+        v = [h]
+        for _ in range(127):
+            x = v[-1]
+            v.append((x >> 1) ^ R if x & 1 else x >> 1)
+
+        self.tables = []
+        for j in range(BLOCK_SIZE):
+            table = [0] * 256
+            for b in range(1, 256):
+                low = b & -b
+                table[b] = table[b ^ low] ^ v[8*j + 8 - low.bit_length()]
+            self.tables.append(table)
+        self.y = 0
+
+    def mul_h(self, x):
+        z = 0
+        for j, table in enumerate(self.tables):
+            z ^= table[(x >> (8 * (15 - j))) & 0xFF]
+        return z
+
+    def update(self, data):
+        """ Absorbs `data`, the last block is zero padded.  """
+        data = memoryview(data).cast("B")
+        y = self.y
+        for i in range(0, len(data), BLOCK_SIZE):
+            block = bytes(data[i:i+BLOCK_SIZE])
+            y = self.mul_h(y ^ int.from_bytes(block.ljust(BLOCK_SIZE, b"\x00"), "big"))
+        self.y = y
+
+    def digest(self):
+        return self.y
+
+
+def _gcm_j0(h, nonce):
+    if len(nonce) == 12:
+        return int.from_bytes(bytes(nonce) + b"\x00\x00\x00\x01", "big")
+    g = GHASH(h)
+    g.update(nonce)
+    g.update((8 * len(nonce)).to_bytes(BLOCK_SIZE, "big"))
+    return g.digest()
+
+def _gcm_tag(key, h, j0, aad, ciphertext, tag_len):
+    g = GHASH(h)
+    g.update(aad)
+    g.update(ciphertext)
+    g.update((8 * len(aad)).to_bytes(8, "big") + (8 * len(ciphertext)).to_bytes(8, "big"))
+    s = int.from_bytes(key.encrypt(j0.to_bytes(BLOCK_SIZE, "big")), "big") ^ g.digest()
+    return s.to_bytes(BLOCK_SIZE, "big")[:tag_len]
+
+def _check_gcm_nonce(nonce):
+    if len(nonce) == 0:
+        raise ValueError("GCM nonce must be at least 1 byte long")
+
+def _check_tag_len(tag_len):
+    if tag_len not in GCM_TAG_LENGTHS:
+        raise ValueError("GCM tag must be 12 to 16 bytes long")
+
+def _inc32(x):
+    return (x & ~0xFFFFFFFF) | ((x + 1) & 0xFFFFFFFF)
+
+def gcm_encrypt(key, nonce, plaintext, associated_data=b"", out=None, tag_len=16):
+    """ Returns (ciphertext, tag).  """
+    _check_gcm_nonce(nonce)
+    _check_tag_len(tag_len)
+    key = _as_key(key)
+    data = memoryview(plaintext).cast("B")
+    out = _output(out, len(data))
+
+    h = int.from_bytes(key.encrypt(bytes(BLOCK_SIZE)), "big")
+    j0 = _gcm_j0(h, nonce)
+    _ctr_xor(key, _inc32(j0), data, out, counter_bits=32)
+    tag = _gcm_tag(key, h, j0, associated_data, memoryview(out)[:len(data)], tag_len)
+    return out, tag
+
+def gcm_decrypt(key, nonce, ciphertext, tag, associated_data=b"", out=None):
+    """ Returns the plaintext, raises ValueError if the tag does not match.  """
+    _check_gcm_nonce(nonce)
+    _check_tag_len(len(tag))
+    key = _as_key(key)
+    data = memoryview(ciphertext).cast("B")
+
+    h = int.from_bytes(key.encrypt(bytes(BLOCK_SIZE)), "big")
+    j0 = _gcm_j0(h, nonce)
+    expected = _gcm_tag(key, h, j0, associated_data, data, len(tag))
+    if not hmac.compare_digest(expected, bytes(tag)):
+        raise ValueError("MAC check failed")
+
+    out = _output(out, len(data))
+    _ctr_xor(key, _inc32(j0), data, out, counter_bits=32)
+    return out
+
+
+
+# Parallel CTR over files: counter blocks are independent, so the file is split
+# into counter-aligned chunks encrypted by separate processes.
+CHUNK_ALIGNMENT = BLOCK_SIZE * mmap.ALLOCATIONGRANULARITY
+
+def _ctr_file_chunk(path_in, path_out, key, nonce, initial_value, offset, length, in_place=False):
+    """ Encrypts input[offset:offset+length] in place into the output file.  """
+    if in_place:
+        # Each block is read before being overwritten, one writable map is enough
+        with open(path_out, "r+b") as f_out, \
+             mmap.mmap(f_out.fileno(), length, access=mmap.ACCESS_WRITE, offset=offset) as dst:
+            ctr_encrypt(key, nonce, dst, out=dst, initial_value=initial_value + offset // BLOCK_SIZE)
+            dst.flush()
+        return length
+
+    with open(path_in, "rb") as f_in, open(path_out, "r+b") as f_out:
+        with mmap.mmap(f_in.fileno(), length, access=mmap.ACCESS_READ, offset=offset) as src, \
+             mmap.mmap(f_out.fileno(), length, access=mmap.ACCESS_WRITE, offset=offset) as dst:
+            ctr_encrypt(key, nonce, src, out=dst, initial_value=initial_value + offset // BLOCK_SIZE)
+            dst.flush()
+    return length
+
+def ctr_encrypt_file(path_in, path_out, key, nonce, workers=None, initial_value=0, chunk_size=None):
+    """
+    CTR encryption (or decryption) of a file with a pool of `workers` processes.
+    Both files are memory-mapped, each worker writes its chunk in place.
+    path_out may be path_in: the file is then encrypted in place, without being truncated first.
+    @return: number of bytes processed.
+    """
+    key = _as_key(key)
+    ctr_block(nonce, initial_value)  # validates the nonce
+    workers = workers or os.cpu_count()
+    size = os.path.getsize(path_in)
+
+    in_place = os.path.exists(path_out) and os.path.samefile(path_in, path_out)
+    if not in_place:
+        with open(path_out, "wb") as f_out:
+            f_out.truncate(size)
+    if size == 0:
+        return 0
+
+    if chunk_size is None:
+        chunk_size = -(-size // workers)
+    # mmap offsets must be multiples of the allocation granularity
+    chunk_size = max(CHUNK_ALIGNMENT, -(-chunk_size // CHUNK_ALIGNMENT) * CHUNK_ALIGNMENT)
+
+    chunks = [(offset, min(chunk_size, size - offset)) for offset in range(0, size, chunk_size)]
+    if workers == 1 or len(chunks) == 1:
+        return sum(
+            _ctr_file_chunk(path_in, path_out, key, nonce, initial_value, offset, length, in_place)
+            for offset, length in chunks
+        )
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_ctr_file_chunk, path_in, path_out, key, nonce, initial_value, offset, length, in_place)
+            for offset, length in chunks
+        ]
+        return sum(f.result() for f in futures)
+
+
+if __name__ == "__main__":
+    # Compare with PyCryptodome
+    from Crypto.Cipher import AES
+    from Crypto.Random import get_random_bytes
+
+    for key_len in (16, 24, 32):
+        key = get_random_bytes(key_len)
+        for length in (0, 16, 160):
+            data = get_random_bytes(length)
+            iv = get_random_bytes(16)
+            assert ecb_encrypt(key, data) == AES.new(key, AES.MODE_ECB).encrypt(data)
+            assert ecb_decrypt(key, ecb_encrypt(key, data)) == data
+            assert cbc_encrypt(key, iv, data) == AES.new(key, AES.MODE_CBC, iv=iv).encrypt(data)
+            assert cbc_decrypt(key, iv, cbc_encrypt(key, iv, data)) == data
+
+        for length in (0, 1, 15, 16, 17, 100):
+            data = get_random_bytes(length)
+            nonce = get_random_bytes(8)
+            assert ctr_encrypt(key, nonce, data) == AES.new(key, AES.MODE_CTR, nonce=nonce).encrypt(data)
+
+            associated_data = get_random_bytes(length)
+            for nonce in (get_random_bytes(12), get_random_bytes(16)):
+                ciphertext, tag = gcm_encrypt(key, nonce, data, associated_data)
+                reference = AES.new(key, AES.MODE_GCM, nonce=nonce)
+                reference.update(associated_data)
+                assert (ciphertext, tag) == reference.encrypt_and_digest(data)
+                assert gcm_decrypt(key, nonce, ciphertext, tag, associated_data) == data
+
+    # Table-driven GHASH multiplication matches the bitwise multiplication
+    h, x = (int.from_bytes(get_random_bytes(16), "big") for _ in range(2))
+    assert GHASH(h).mul_h(x) == gf128_mul(x, h)
+
+    # Parallel CTR on files
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        path_in, path_out = os.path.join(tmp, "in"), os.path.join(tmp, "out")
+        data = get_random_bytes(5 * CHUNK_ALIGNMENT + 1000)
+        with open(path_in, "wb") as f:
+            f.write(data)
+        key, nonce = get_random_bytes(16), get_random_bytes(8)
+        ctr_encrypt_file(path_in, path_out, key, nonce, workers=4, chunk_size=CHUNK_ALIGNMENT)
+        with open(path_out, "rb") as f:
+            assert f.read() == AES.new(key, AES.MODE_CTR, nonce=nonce).encrypt(data)
+
+        # In place: encrypting the output again gives back the plaintext
+        ctr_encrypt_file(path_out, path_out, key, nonce, workers=4, chunk_size=CHUNK_ALIGNMENT)
+        with open(path_out, "rb") as f:
+            assert f.read() == data
+
+    # Output written into a preallocated buffer
+    key = AESKey(b"rijndaelrijndael")
+    plaintext = b"crypto{MYAES128}" * 4
+    out = bytearray(len(plaintext))
+    ecb_encrypt(key, memoryview(plaintext), out=out)
+    print(f"AES-128-ECB: {out.hex()}")
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 s_box = (
     0x63, 0x7C, 0x77, 0x7B, 0xF2, 0x6B, 0x6F, 0xC5, 0x30, 0x01, 0x67, 0x2B, 0xFE, 0xD7, 0xAB, 0x76,
     0xCA, 0x82, 0xC9, 0x7D, 0xFA, 0x59, 0x47, 0xF0, 0xAD, 0xD4, 0xA2, 0xAF, 0x9C, 0xA4, 0x72, 0xC0,
@@ -46,6 +48,43 @@ NB_ROUNDS = {
 xtime = lambda a: (((a << 1) ^ 0x1B) & 0xFF) if (a & 0x80) else (a << 1)
 
 
+def gmul(a, b):
+    """ Multiplies two bytes in GF(2^8) with the Rijndael polynomial.  """
+    p = 0
+    while b:
+        if b & 1:
+            p ^= a
+        a = xtime(a)
+        b >>= 1
+    return p
+
+
+def _ror8(w):
+    return ((w >> 8) | (w << 24)) & 0xFFFFFFFF
+
+
+# T-tables: SubBytes, ShiftRows and MixColumns merged into 32-bit lookups
+# (see Sec 4.2 in The Design of Rijndael).
+# Te0[x] = (2.S[x], S[x], S[x], 3.S[x]) and Td0[x] = (e.Si[x], 9.Si[x], d.Si[x], b.Si[x])
+Te0 = tuple(
+    (gmul(s, 2) << 24) | (s << 16) | (s << 8) | gmul(s, 3)
+    for s in s_box
+)
+Te1 = tuple(_ror8(w) for w in Te0)
+Te2 = tuple(_ror8(w) for w in Te1)
+Te3 = tuple(_ror8(w) for w in Te2)
+
+Td0 = tuple(
+    (gmul(s, 14) << 24) | (gmul(s, 9) << 16) | (gmul(s, 13) << 8) | gmul(s, 11)
+    for s in inv_s_box
+)
+Td1 = tuple(_ror8(w) for w in Td0)
+Td2 = tuple(_ror8(w) for w in Td1)
+Td3 = tuple(_ror8(w) for w in Td2)
+
+ENGINES = ("reference", "ttable")
+
+
 def bytes2matrix(text):
     """ Converts a (4N)-byte array into a 4xN matrix.  """
     return [list(text[i:i+4]) for i in range(0, len(text), 4)]
@@ -174,8 +213,8 @@ def expand_key(master_key, size="128"):
 
 
 # Rijndael
-def decrypt(key, ciphertext, size="128"):
-    round_keys = expand_key(key, size) # Remember to start from the last round key and work backwards through them when decrypting
+def _decrypt_reference(round_keys, ciphertext, size="128"):
+    # Remember to start from the last round key and work backwards through them when decrypting
     # print(round_keys)
     
     # Convert ciphertext to state matrix
@@ -206,8 +245,7 @@ def decrypt(key, ciphertext, size="128"):
     plaintext = matrix2bytes(state)
     return plaintext
 
-def encrypt(key, plaintext, size="128"):
-    round_keys = expand_key(key, size) # Remember to start from the last round key and work backwards through them when decrypting
+def _encrypt_reference(round_keys, plaintext, size="128"):
     # print(round_keys)
     
     # Convert ciphertext to state matrix
@@ -234,4 +272,184 @@ def encrypt(key, plaintext, size="128"):
 
     # Convert state matrix to plaintext
     ciphertext = matrix2bytes(state)
-    return ciphertext
\ No newline at end of file
+    return ciphertext
+
+
+# T-table engine: the state is kept as four 32-bit big-endian column words.
+def words(block):
+    """ Converts a (4N)-byte block into N 32-bit column words.  """
+    return [int.from_bytes(block[i:i+4], "big") for i in range(0, len(block), 4)]
+
+def unwords(w):
+    """ Converts four 32-bit column words into a 16-byte block.  """
+    return b"".join(x.to_bytes(4, "big") for x in w)
+
+def inv_mix_word(w):
+    """ Applies InvMixColumns to a single column word.  """
+    return (
+        Td0[s_box[w >> 24]] ^ Td1[s_box[(w >> 16) & 0xFF]]
+        ^ Td2[s_box[(w >> 8) & 0xFF]] ^ Td3[s_box[w & 0xFF]]
+    )
+
+def sub_word(w):
+    """ Applies the S-box to each byte of a 32-bit word.  """
+    return (
+        (s_box[w >> 24] << 24) | (s_box[(w >> 16) & 0xFF] << 16)
+        | (s_box[(w >> 8) & 0xFF] << 8) | s_box[w & 0xFF]
+    )
+
+def expand_key_words(master_key, size="128"):
+    """
+    Expands and returns the list of 4*(Nr+1) round key words for the given master_key.
+    """
+    size = str(size)
+    if size not in NB_ROUNDS or len(master_key) * 8 != int(size):
+        raise ValueError("Invalid key size")
+
+    nk = len(master_key) // 4
+    nr = NB_ROUNDS[size]
+    ek = words(master_key)
+
+    rcon = 1
+    for i in range(nk, 4 * (nr + 1)):
+        w = ek[-1]
+        if i % nk == 0:
+            # RotWord, SubWord and XOR with the round constant.
+            w = sub_word(((w << 8) | (w >> 24)) & 0xFFFFFFFF) ^ (rcon << 24)
+            rcon = xtime(rcon)
+        elif nk == 8 and i % nk == 4:
+            w = sub_word(w)
+        ek.append(ek[i - nk] ^ w)
+    return ek
+
+def inv_expand_key_words(ek, size="128"):
+    """
+    Returns the round key words of the equivalent inverse cipher (see FIPS-197 Sec 5.3.5):
+    keys in reverse order, InvMixColumns applied to all of them but the first and the last.
+    """
+    nr = NB_ROUNDS[str(size)]
+    dk = list(ek[4*nr : 4*nr + 4])
+    for r in range(nr - 1, 0, -1):
+        dk.extend(inv_mix_word(w) for w in ek[4*r : 4*r + 4])
+    dk.extend(ek[0:4])
+    return dk
+
+def encrypt_block_words(ek, nr, block):
+    """ Encrypts a 16-byte block with the T-tables and the round key words `ek`.  """
+    T0, T1, T2, T3 = Te0, Te1, Te2, Te3
+    x = int.from_bytes(block, "big")
+    s0 = (x >> 96) ^ ek[0]
+    s1 = ((x >> 64) & 0xFFFFFFFF) ^ ek[1]
+    s2 = ((x >> 32) & 0xFFFFFFFF) ^ ek[2]
+    s3 = (x & 0xFFFFFFFF) ^ ek[3]
+
+    for k in range(4, 4 * nr, 4):
+        t0 = T0[s0 >> 24] ^ T1[(s1 >> 16) & 0xFF] ^ T2[(s2 >> 8) & 0xFF] ^ T3[s3 & 0xFF] ^ ek[k]
+        t1 = T0[s1 >> 24] ^ T1[(s2 >> 16) & 0xFF] ^ T2[(s3 >> 8) & 0xFF] ^ T3[s0 & 0xFF] ^ ek[k+1]
+        t2 = T0[s2 >> 24] ^ T1[(s3 >> 16) & 0xFF] ^ T2[(s0 >> 8) & 0xFF] ^ T3[s1 & 0xFF] ^ ek[k+2]
+        s3 = T0[s3 >> 24] ^ T1[(s0 >> 16) & 0xFF] ^ T2[(s1 >> 8) & 0xFF] ^ T3[s2 & 0xFF] ^ ek[k+3]
+        s0, s1, s2 = t0, t1, t2
+
+    # Final round (skips the MixColumns step), the four words are packed into one integer
+    sb = s_box
+    k = 4 * nr
+    return ((
+        ((sb[s0 >> 24] << 24 | sb[(s1 >> 16) & 0xFF] << 16 | sb[(s2 >> 8) & 0xFF] << 8 | sb[s3 & 0xFF]) ^ ek[k]) << 96
+        | ((sb[s1 >> 24] << 24 | sb[(s2 >> 16) & 0xFF] << 16 | sb[(s3 >> 8) & 0xFF] << 8 | sb[s0 & 0xFF]) ^ ek[k+1]) << 64
+        | ((sb[s2 >> 24] << 24 | sb[(s3 >> 16) & 0xFF] << 16 | sb[(s0 >> 8) & 0xFF] << 8 | sb[s1 & 0xFF]) ^ ek[k+2]) << 32
+        | ((sb[s3 >> 24] << 24 | sb[(s0 >> 16) & 0xFF] << 16 | sb[(s1 >> 8) & 0xFF] << 8 | sb[s2 & 0xFF]) ^ ek[k+3])
+    )).to_bytes(16, "big")
+
+def decrypt_block_words(dk, nr, block):
+    """ Decrypts a 16-byte block with the T-tables and the inverse round key words `dk`.  """
+    T0, T1, T2, T3 = Td0, Td1, Td2, Td3
+    x = int.from_bytes(block, "big")
+    s0 = (x >> 96) ^ dk[0]
+    s1 = ((x >> 64) & 0xFFFFFFFF) ^ dk[1]
+    s2 = ((x >> 32) & 0xFFFFFFFF) ^ dk[2]
+    s3 = (x & 0xFFFFFFFF) ^ dk[3]
+
+    for k in range(4, 4 * nr, 4):
+        t0 = T0[s0 >> 24] ^ T1[(s3 >> 16) & 0xFF] ^ T2[(s2 >> 8) & 0xFF] ^ T3[s1 & 0xFF] ^ dk[k]
+        t1 = T0[s1 >> 24] ^ T1[(s0 >> 16) & 0xFF] ^ T2[(s3 >> 8) & 0xFF] ^ T3[s2 & 0xFF] ^ dk[k+1]
+        t2 = T0[s2 >> 24] ^ T1[(s1 >> 16) & 0xFF] ^ T2[(s0 >> 8) & 0xFF] ^ T3[s3 & 0xFF] ^ dk[k+2]
+        s3 = T0[s3 >> 24] ^ T1[(s2 >> 16) & 0xFF] ^ T2[(s1 >> 8) & 0xFF] ^ T3[s0 & 0xFF] ^ dk[k+3]
+        s0, s1, s2 = t0, t1, t2
+
+    # Final round (skips the InvMixColumns step), the four words are packed into one integer
+    sb = inv_s_box
+    k = 4 * nr
+    return ((
+        ((sb[s0 >> 24] << 24 | sb[(s3 >> 16) & 0xFF] << 16 | sb[(s2 >> 8) & 0xFF] << 8 | sb[s1 & 0xFF]) ^ dk[k]) << 96
+        | ((sb[s1 >> 24] << 24 | sb[(s0 >> 16) & 0xFF] << 16 | sb[(s3 >> 8) & 0xFF] << 8 | sb[s2 & 0xFF]) ^ dk[k+1]) << 64
+        | ((sb[s2 >> 24] << 24 | sb[(s1 >> 16) & 0xFF] << 16 | sb[(s0 >> 8) & 0xFF] << 8 | sb[s3 & 0xFF]) ^ dk[k+2]) << 32
+        | ((sb[s3 >> 24] << 24 | sb[(s2 >> 16) & 0xFF] << 16 | sb[(s1 >> 8) & 0xFF] << 8 | sb[s0 & 0xFF]) ^ dk[k+3])
+    )).to_bytes(16, "big")
+
+
+# Cipher context: the key schedule is expanded once and reused for every block.
+class AESKey:
+    """
+    Expanded AES key.
+    Holds the round key matrices of the reference engine, the round key words
+    of the T-table engine and the equivalent inverse cipher round key words.
+    """
+
+    def __init__(self, master_key, size=None):
+        master_key = bytes(master_key)
+        size = str(size) if size is not None else str(len(master_key) * 8)
+        if size not in NB_ROUNDS or len(master_key) * 8 != int(size):
+            raise ValueError("Invalid key size")
+
+        self.size = size
+        self.nr = NB_ROUNDS[size]
+        self.round_keys = expand_key(master_key, size)
+        self.ek = expand_key_words(master_key, size)
+        self.dk = inv_expand_key_words(self.ek, size)
+
+    def encrypt(self, plaintext, engine="ttable"):
+        """ Encrypts a 16-byte block.  """
+        if engine == "ttable":
+            return encrypt_block_words(self.ek, self.nr, plaintext)
+        elif engine == "reference":
+            return _encrypt_reference(self.round_keys, plaintext, self.size)
+        raise ValueError(f"Unknown engine, expected one of {ENGINES}")
+
+    def decrypt(self, ciphertext, engine="ttable"):
+        """ Decrypts a 16-byte block.  """
+        if engine == "ttable":
+            return decrypt_block_words(self.dk, self.nr, ciphertext)
+        elif engine == "reference":
+            return _decrypt_reference(self.round_keys, ciphertext, self.size)
+        raise ValueError(f"Unknown engine, expected one of {ENGINES}")
+
+
+KEY_CACHE_SIZE = 64
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _cached_key(master_key, size):
+    return AESKey(master_key, size)
+
+def get_key(master_key, size="128"):
+    """
+    Returns the expanded AESKey of `master_key`.
+    The last KEY_CACHE_SIZE keys are kept in an LRU cache.
+    """
+    return _cached_key(bytes(master_key), str(size))
+
+
+def decrypt(key, ciphertext, size="128", engine="ttable"):
+    """
+    Decrypts a 16-byte block.
+    engine = "ttable" (default) runs the 32-bit T-table implementation,
+    engine = "reference" runs the step-by-step matrix implementation (same output).
+    """
+    return get_key(key, size).decrypt(ciphertext, engine)
+
+def encrypt(key, plaintext, size="128", engine="ttable"):
+    """
+    Encrypts a 16-byte block.
+    engine = "ttable" (default) runs the 32-bit T-table implementation,
+    engine = "reference" runs the step-by-step matrix implementation (same output).
+    """
+    return get_key(key, size).encrypt(plaintext, engine)
@@ -1,3 +1,5 @@
+from operator import itemgetter
+
 sbox = [
     0x63, 0x7c, 0x77, 0x7b, 0xf2, 0x6b, 0x6f, 0xc5, 0x30, 0x01, 0x67, 0x2b, 0xfe, 0xd7, 0xab, 0x76,
     0xca, 0x82, 0xc9, 0x7d, 0xfa, 0x59, 0x47, 0xf0, 0xad, 0xd4, 0xa2, 0xaf, 0x9c, 0xa4, 0x72, 0xc0,
@@ -58,6 +60,21 @@ multiplication_by_3 = [
 LEN_AES = 16
 LEN_ROW = 4
 
+# Table inverse de sbox
+inv_sbox = [0] * 256
+for i, v in enumerate(sbox):
+    inv_sbox[v] = i
+
+SBOX = bytes(sbox)
+INV_SBOX = bytes(inv_sbox)
+
+# state[j*LEN_ROW + i] est l'élément de la ligne i et de la colonne j.
+# ShiftRow : nouvel état [i, j] = ancien état [i, (j + i) % 4]
+SHIFT_ROW = tuple(LEN_ROW * ((k // LEN_ROW + k % LEN_ROW) % LEN_ROW) + k % LEN_ROW for k in range(LEN_AES))
+INV_SHIFT_ROW = tuple(SHIFT_ROW.index(k) for k in range(LEN_AES))
+_shift_row = itemgetter(*SHIFT_ROW)
+_inv_shift_row = itemgetter(*INV_SHIFT_ROW)
+
 def str_to_bytes(s: str):
     i = 0
     b = []
@@ -66,18 +83,9 @@ def str_to_bytes(s: str):
         i += 2
     return b
 
-def _one_shift(l):
-    return l[1:] + [l[0]]
-
-def _mix_one_columns(r):
-    z = []
-    z.append(multiplication_by_2[r[0]] ^ multiplication_by_3[r[1]] ^ r[2] ^ r[3])
-    z.append(multiplication_by_2[r[1]] ^ multiplication_by_3[r[2]] ^ r[3] ^ r[0])
-    z.append(multiplication_by_2[r[2]] ^ multiplication_by_3[r[3]] ^ r[0] ^ r[1])
-    z.append(multiplication_by_2[r[3]] ^ multiplication_by_3[r[0]] ^ r[1] ^ r[2])
-    return z
-
 class AES:
+    __slots__ = ("state",)
+
     def __init__(self, ini: str):
         """
         Bien lire colonne par colonne ie le 2ème élement est sur la 2ème ligne
@@ -85,77 +93,42 @@ class AES:
         if len(ini) != 2*LEN_AES:
             print("Erreur la valeur d'entrée dans AES n'est pas la bonne !")
             exit(1)
-        self.state = str_to_bytes(ini)
-        
-    def _to_row(self):
-        """
-        Permet de mettre state sous la forme d'une matrice :
-        liste de 4 éléments représentant chacun une ligne
-        """
-        m = []
-        for i in range(LEN_ROW):
-            r = []
-            for j in range(LEN_ROW):
-                r.append(self.state[j*LEN_ROW + i])
-            m.append(r)
-        return m
-    
-    def _from_row(self, mat):
-        """
-        Inverse de la fonction _to_row
-        """
-        for i in range(LEN_ROW):
-            for j in range(LEN_ROW):
-                self.state[j*LEN_ROW + i] = mat[i][j]
-    
-    def _to_colum(self):
-        """
-        Permet de mettre state sous la forme d'une matrice :
-        liste de 4 éléments représentant chacun une colonne
-        """
-        m = []
-        for i in range(LEN_ROW):
-            r = []
-            for j in range(LEN_ROW):
-                r.append(self.state[i*LEN_ROW + j])
-            m.append(r)
-        return m
+        self.state = bytearray(str_to_bytes(ini))
 
-    def _from_column(self, m):
-        """
-        permet d'inverser _to_column
-        """
-        for i in range(LEN_ROW):
-            for j in range(LEN_ROW):
-                self.state[i * LEN_ROW + j] = m[i][j]
-    
     def print_state(self):
         for i in range(LEN_ROW):
             for j in range(LEN_ROW):
                 print("{:02x}".format(self.state[j * LEN_ROW + i]), end=" ")
             print()
         print()
-        
+
+    def hex(self):
+        return self.state.hex()
+
     def SubBytes(self):
         """
         state[i] = sbox[state[i]]
         """
-        for i in range(LEN_AES):
-            self.state[i] = sbox[self.state[i]]
-    
+        self.state[:] = self.state.translate(SBOX)
+
+    def InvSubBytes(self):
+        """
+        state[i] = inv_sbox[state[i]]
+        """
+        self.state[:] = self.state.translate(INV_SBOX)
+
     def ShiftRow(self):
         """
         On shift la ième ligne de i place vers la gauche (on commence avec la première ligne à 0)
         """
-        m = self._to_row()
-        r = []
-        for i in range(4):
-            t = m[i]
-            for _ in range(i):
-                t = _one_shift(t)
-            r.append(t)
-        self._from_row(r)
-    
+        self.state[:] = _shift_row(self.state)
+
+    def InvShiftRow(self):
+        """
+        On shift la ième ligne de i place vers la droite
+        """
+        self.state[:] = _inv_shift_row(self.state)
+
     def MixColumn(self):
         """
         On multiplie :
@@ -165,12 +138,67 @@ class AES:
         3 1 1 2
         En pratique on fait la multiplication colonne par colonne
         """
-        m = self._to_colum()
-        r = []
-        for i in range(4):
-            r.append(_mix_one_columns(m[i]))
-        self._from_column(r)
-            
+        s = self.state
+        for c in range(0, LEN_AES, LEN_ROW):
+            r0, r1, r2, r3 = s[c], s[c+1], s[c+2], s[c+3]
+            s[c] = multiplication_by_2[r0] ^ multiplication_by_3[r1] ^ r2 ^ r3
+            s[c+1] = multiplication_by_2[r1] ^ multiplication_by_3[r2] ^ r3 ^ r0
+            s[c+2] = multiplication_by_2[r2] ^ multiplication_by_3[r3] ^ r0 ^ r1
+            s[c+3] = multiplication_by_2[r3] ^ multiplication_by_3[r0] ^ r1 ^ r2
+
+    def InvMixColumn(self):
+        """
+        On multiplie par l'inverse de la matrice de MixColumn :
+        e b d 9
+        9 e b d
+        d 9 e b avec state
+        b d 9 e
+        En pratique on multiplie d'abord par la matrice
+        5 0 4 0
+        0 5 0 4
+        4 0 5 0
+        0 4 0 5 puis on applique MixColumn (cf 4.1.3 de The Design of Rijndael)
+        """
+        s = self.state
+        for c in range(0, LEN_AES, LEN_ROW):
+            u = multiplication_by_2[multiplication_by_2[s[c] ^ s[c+2]]]
+            v = multiplication_by_2[multiplication_by_2[s[c+1] ^ s[c+3]]]
+            s[c] ^= u
+            s[c+1] ^= v
+            s[c+2] ^= u
+            s[c+3] ^= v
+        self.MixColumn()
+
+    def AddRoundKey(self, key):
+        """
+        state[i] = state[i] ^ key[i], la clé de tour est donnée
+        en hexadécimal ou sous forme de 16 octets
+        """
+        if isinstance(key, str):
+            key = bytes.fromhex(key)
+        x = int.from_bytes(self.state, "big") ^ int.from_bytes(key, "big")
+        self.state[:] = x.to_bytes(LEN_AES, "big")
+
+    def Round(self, key, last=False):
+        """
+        Un tour de chiffrement, le dernier tour n'a pas de MixColumn
+        """
+        self.SubBytes()
+        self.ShiftRow()
+        if not last:
+            self.MixColumn()
+        self.AddRoundKey(key)
+
+    def InvRound(self, key, last=False):
+        """
+        Un tour de déchiffrement, le dernier tour n'a pas de InvMixColumn
+        """
+        self.InvShiftRow()
+        self.InvSubBytes()
+        self.AddRoundKey(key)
+        if not last:
+            self.InvMixColumn()
+
 if __name__ == "__main__":
     # a = AES("a05a4f987eb505650089a10f5b208f03")
     a = AES("12cf21de00a4f405c64ea97882ec6b60")
@@ -184,4 +212,27 @@ if __name__ == "__main__":
     a.print_state()
     a.MixColumn()
     print("Après MixColumn")
-    a.print_state()
\ No newline at end of file
+    a.print_state()
+
+    # Les étapes inverses
+    a.InvMixColumn()
+    a.InvShiftRow()
+    a.InvSubBytes()
+    assert a.hex() == "12cf21de00a4f405c64ea97882ec6b60"
+
+    # Chiffrement complet AES-128 (FIPS-197 Annexe C.1)
+    from primitives import expand_key_words
+    round_keys = [
+        b"".join(w.to_bytes(4, "big") for w in expand_key_words(bytes(range(16)))[4*r : 4*r + 4])
+        for r in range(11)
+    ]
+    a = AES("00112233445566778899aabbccddeeff")
+    a.AddRoundKey(round_keys[0])
+    for r in range(1, 11):
+        a.Round(round_keys[r], last=(r == 10))
+    assert a.hex() == "69c4e0d86a7b0430d8cdb78070b4c55a"
+
+    a.AddRoundKey(round_keys[10])
+    for r in range(9, -1, -1):
+        a.InvRound(round_keys[r], last=(r == 0))
+    assert a.hex() == "00112233445566778899aabbccddeeff"
@@ -0,0 +1,170 @@
+"""
+AES round functions vectorized with NumPy.
+The state of N blocks is an (N, 16) uint8 array, byte p of a block is at
+row p % 4 and column p // 4 (same layout as bytes2matrix).
+"""
+import numpy as np
+
+from primitives import AESKey, get_key, gmul, inv_s_box
+from round import sbox, multiplication_by_2, multiplication_by_3
+
+BLOCK_SIZE = 16
+
+S_BOX = np.array(sbox, dtype=np.uint8)
+INV_S_BOX = np.array(inv_s_box, dtype=np.uint8)
+MUL2 = np.array(multiplication_by_2, dtype=np.uint8)
+MUL3 = np.array(multiplication_by_3, dtype=np.uint8)
+MUL9, MUL11, MUL13, MUL14 = (
+    np.array([gmul(x, c) for x in range(256)], dtype=np.uint8) for c in (9, 11, 13, 14)
+)
+
+# ShiftRows as a gather: new[r, c] = old[r, (c + r) % 4]
+SHIFT_ROWS = np.array([4 * ((p // 4 + p % 4) % 4) + p % 4 for p in range(BLOCK_SIZE)])
+INV_SHIFT_ROWS = np.argsort(SHIFT_ROWS)
+
+
+# Confusion
+def sub_bytes(state):
+    return S_BOX[state]
+
+def inv_sub_bytes(state):
+    return INV_S_BOX[state]
+
+
+# Diffusion
+def shift_rows(state):
+    return state[:, SHIFT_ROWS]
+
+def inv_shift_rows(state):
+    return state[:, INV_SHIFT_ROWS]
+
+def mix_columns(state):
+    s = state.reshape(-1, 4, 4)
+    a0, a1, a2, a3 = s[:, :, 0], s[:, :, 1], s[:, :, 2], s[:, :, 3]
+    out = np.empty_like(s)
+    out[:, :, 0] = MUL2[a0] ^ MUL3[a1] ^ a2 ^ a3
+    out[:, :, 1] = a0 ^ MUL2[a1] ^ MUL3[a2] ^ a3
+    out[:, :, 2] = a0 ^ a1 ^ MUL2[a2] ^ MUL3[a3]
+    out[:, :, 3] = MUL3[a0] ^ a1 ^ a2 ^ MUL2[a3]
+    return out.reshape(-1, BLOCK_SIZE)
+
+def inv_mix_columns(state):
+    s = state.reshape(-1, 4, 4)
+    a0, a1, a2, a3 = s[:, :, 0], s[:, :, 1], s[:, :, 2], s[:, :, 3]
+    out = np.empty_like(s)
+    out[:, :, 0] = MUL14[a0] ^ MUL11[a1] ^ MUL13[a2] ^ MUL9[a3]
+    out[:, :, 1] = MUL9[a0] ^ MUL14[a1] ^ MUL11[a2] ^ MUL13[a3]
+    out[:, :, 2] = MUL13[a0] ^ MUL9[a1] ^ MUL14[a2] ^ MUL11[a3]
+    out[:, :, 3] = MUL11[a0] ^ MUL13[a1] ^ MUL9[a2] ^ MUL14[a3]
+    return out.reshape(-1, BLOCK_SIZE)
+
+
+# Encryption: XOR operation, the round key is broadcast over the N blocks
+def add_round_key(state, round_key):
+    return state ^ round_key
+
+
+def round_keys(key):
+    """ Round keys of an AESKey as an (Nr+1, 16) uint8 array.  """
+    words = np.array(key.ek, dtype=">u4")
+    return words.view(np.uint8).reshape(key.nr + 1, BLOCK_SIZE)
+
+def _as_key(key):
+    return key if isinstance(key, AESKey) else get_key(key, len(key) * 8)
+
+def _as_state(blocks):
+    state = np.frombuffer(blocks, dtype=np.uint8) if not isinstance(blocks, np.ndarray) else blocks
+    if state.size % BLOCK_SIZE:
+        raise ValueError("Data must be aligned to the block size (16 bytes)")
+    return state.reshape(-1, BLOCK_SIZE)
+
+
+# Rijndael
+def encrypt(key, blocks):
+    """
+    Encrypts N blocks at once.
+    @param key: AESKey or master key bytes.
+    @param blocks: (N, 16) uint8 array or bytes-like of 16N bytes.
+    @return: (N, 16) uint8 array.
+    """
+    key = _as_key(key)
+    rk = round_keys(key)
+    state = add_round_key(_as_state(blocks), rk[0])
+
+    for i in range(1, key.nr):
+        state = sub_bytes(state)
+        state = shift_rows(state)
+        state = mix_columns(state)
+        state = add_round_key(state, rk[i])
+
+    # Run final round (skips the MixColumns step)
+    state = sub_bytes(state)
+    state = shift_rows(state)
+    return add_round_key(state, rk[key.nr])
+
+def decrypt(key, blocks):
+    """ Inverse of encrypt.  """
+    key = _as_key(key)
+    rk = round_keys(key)
+    state = add_round_key(_as_state(blocks), rk[key.nr])
+
+    for i in range(key.nr - 1, 0, -1):
+        state = inv_shift_rows(state)
+        state = inv_sub_bytes(state)
+        state = add_round_key(state, rk[i])
+        state = inv_mix_columns(state)
+
+    # Run final round (skips the InvMixColumns step)
+    state = inv_shift_rows(state)
+    state = inv_sub_bytes(state)
+    return add_round_key(state, rk[0])
+
+
+# Modes of operation at array speed
+def ecb_encrypt(key, data):
+    return encrypt(key, data).tobytes()
+
+def ecb_decrypt(key, data):
+    return decrypt(key, data).tobytes()
+
+def ctr_keystream(key, nonce, n_blocks, initial_value=0):
+    """
+    Keystream of n_blocks counter blocks nonce || counter (same convention as modes.ctr_encrypt).
+    The counter is kept on 64 bits, the nonce must be 8 bytes long.
+    """
+    if len(nonce) != 8:
+        raise ValueError("Nonce must be 8 bytes long")
+    counters = np.empty((n_blocks, BLOCK_SIZE), dtype=np.uint8)
+    counters[:, :8] = np.frombuffer(bytes(nonce), dtype=np.uint8)
+    values = np.arange(initial_value, initial_value + n_blocks, dtype=np.uint64).astype(">u8")
+    counters[:, 8:] = values.view(np.uint8).reshape(n_blocks, 8)
+    return encrypt(key, counters)
+
+def ctr_encrypt(key, nonce, data, initial_value=0):
+    data = np.frombuffer(data, dtype=np.uint8)
+    n_blocks = -(-data.size // BLOCK_SIZE)
+    keystream = ctr_keystream(key, nonce, n_blocks, initial_value).reshape(-1)
+    return (data ^ keystream[:data.size]).tobytes()
+
+ctr_decrypt = ctr_encrypt
+
+
+if __name__ == "__main__":
+    from os import urandom
+    from modes import ctr_encrypt as ctr_reference
+
+    # FIPS-197 Appendix C.1
+    key = bytes(range(16))
+    plaintext = bytes.fromhex("00112233445566778899aabbccddeeff")
+    assert ecb_encrypt(key, plaintext).hex() == "69c4e0d86a7b0430d8cdb78070b4c55a"
+
+    for key_len in (16, 24, 32):
+        key = AESKey(urandom(key_len))
+        data = urandom(16 * 100)
+        ciphertext = ecb_encrypt(key, data)
+        assert ciphertext == b"".join(key.encrypt(data[i:i+16]) for i in range(0, len(data), 16))
+        assert ecb_decrypt(key, ciphertext) == data
+
+        nonce = urandom(8)
+        assert ctr_encrypt(key, nonce, data[:1000]) == bytes(ctr_reference(key, nonce, data[:1000]))
+    print("ok")
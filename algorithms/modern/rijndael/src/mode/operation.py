@@ -1,8 +1,15 @@
+import os
+
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
 from Crypto.Random import get_random_bytes
 
+BUFFER_SIZE = 1 << 20
+
 class authenticated_AES:
+    # Modes which accept the message piece by piece.
+    STREAMING_MODES = ["EAX", "GCM", "OCB"]
+
     def __init__(self, key: bytes, mode: str, nonce: bytes):
         """
         CCM : Length of parameter 'nonce' must be in the range 7..13 bytes
@@ -12,17 +19,22 @@ class authenticated_AES:
         self.key = key
         self.mode = mode.upper()
         self.nonce = nonce
+        # Next record counter of seal_many, 0 is the nonce of encrypt()
+        self.counter = 1
         self.MODES = ["CCM", "EAX", "GCM", "OCB", "SIV"]
 
-    def encrypt(self, plaintext: bytes, associated_data: bytes = None):
-        # Initialize cipher
+    def _mode_id(self):
         if self.mode in self.MODES:
-            cipher = AES.new(
-                self.key, getattr(AES, f"MODE_{self.mode}"), nonce=self.nonce
-            )
-
+            return getattr(AES, f"MODE_{self.mode}")
         else:
-            raise ("Unsupported AEAD mode!")
+            raise ValueError("Unsupported AEAD mode!")
+
+    def _new_cipher(self):
+        return AES.new(self.key, self._mode_id(), nonce=self.nonce)
+
+    def encrypt(self, plaintext: bytes, associated_data: bytes = None):
+        # Initialize cipher
+        cipher = self._new_cipher()
 
         if associated_data:
             cipher.update(associated_data)
@@ -31,17 +43,187 @@ class authenticated_AES:
         return ciphertext, tag
 
     def decrypt(self, ciphertext: bytes, tag: bytes, associated_data: bytes):
-        if self.mode in self.MODES:
-            cipher = AES.new(
-                self.key, getattr(AES, f"MODE_{self.mode}"), nonce=self.nonce
-            )
-        else:
-            raise ("Unsupported AEAD mode!")
+        cipher = self._new_cipher()
 
         if associated_data:
             cipher.update(associated_data)
 
         try:
             return cipher.decrypt_and_verify(ciphertext, tag)
-        except:
-            raise ("Key incorrect or message corrupted!")
\ No newline at end of file
+        except ValueError:
+            raise ValueError("Key incorrect or message corrupted!")
+
+    # Batch interface
+    def derive_nonce(self, counter: int):
+        """
+        Nonce of the message number `counter`: self.nonce XOR counter (big endian),
+        as the per-record nonces of TLS 1.3. Counter 0 is the nonce of encrypt().
+        """
+        n = len(self.nonce)
+        if not 0 <= counter < 1 << (8 * n):
+            raise ValueError("Nonce counter exhausted, use a new key or nonce!")
+        return (int.from_bytes(self.nonce, "big") ^ counter).to_bytes(n, "big")
+
+    def seal_many(self, records, aad_list=None):
+        """
+        Encrypts many records, record i uses the nonce derive_nonce(self.counter + i).
+        The counter starts at 1 (0 belongs to encrypt()) and every batch advances it,
+        so two batches never share a nonce. Read self.counter before the call and give it to open_many.
+        The mode is resolved once for the whole batch.
+        @return: list of (ciphertext, tag)
+        """
+        new, key, mode = AES.new, self.key, self._mode_id()
+        first = self.counter
+        self.derive_nonce(first + len(records) - 1)  # raises if the counter overflows the nonce
+        self.counter = first + len(records)
+        base = int.from_bytes(self.nonce, "big")
+        n = len(self.nonce)
+
+        results = [None] * len(records)
+        for i, record in enumerate(records):
+            nonce = (base ^ (first + i)).to_bytes(n, "big")
+            cipher = new(key, mode, nonce=nonce)
+            if aad_list is not None and aad_list[i]:
+                cipher.update(aad_list[i])
+            results[i] = cipher.encrypt_and_digest(record)
+        return results
+
+    def open_many(self, sealed, aad_list=None, initial_counter: int = 1):
+        """
+        Decrypts the (ciphertext, tag) pairs produced by seal_many, `initial_counter` being
+        the counter of the sealing instance before the batch (1 for its first batch).
+        @return: list of plaintexts, None for the records which fail authentication.
+        """
+        if initial_counter < 1:
+            raise ValueError("Counter 0 is reserved for encrypt()!")
+        new, key, mode = AES.new, self.key, self._mode_id()
+        self.derive_nonce(initial_counter + len(sealed) - 1)
+        base = int.from_bytes(self.nonce, "big")
+        n = len(self.nonce)
+
+        results = [None] * len(sealed)
+        for i, (ciphertext, tag) in enumerate(sealed):
+            nonce = (base ^ (initial_counter + i)).to_bytes(n, "big")
+            cipher = new(key, mode, nonce=nonce)
+            if aad_list is not None and aad_list[i]:
+                cipher.update(aad_list[i])
+            try:
+                results[i] = cipher.decrypt_and_verify(ciphertext, tag)
+            except ValueError:
+                pass
+        return results
+
+    # Incremental interface
+    def _new_stream(self, decrypt):
+        if self.mode not in self.STREAMING_MODES:
+            raise ValueError(f"Streaming is only supported in {self.STREAMING_MODES} modes!")
+        return AEADStream(self._new_cipher(), self.mode, decrypt)
+
+    def encryptor(self):
+        """
+        @return: AEADStream, feed it with update_associated_data(chunk) then update(chunk),
+        the tag is available after finalize().
+        """
+        return self._new_stream(decrypt=False)
+
+    def decryptor(self):
+        """
+        @return: AEADStream, feed it with update_associated_data(chunk) then update(chunk),
+        finalize(tag) raises ValueError if the tag does not match.
+        """
+        return self._new_stream(decrypt=True)
+
+    def encrypt_file(self, path_in, path_out, associated_data: bytes = None, buffer_size=BUFFER_SIZE):
+        """
+        Encrypts a file in constant memory with a reusable buffer of `buffer_size` bytes.
+        @return: tag
+        """
+        stream = self.encryptor()
+        if associated_data:
+            stream.update_associated_data(associated_data)
+        _stream_file(stream, path_in, path_out, buffer_size)
+        return stream.tag
+
+    def decrypt_file(self, path_in, path_out, tag: bytes, associated_data: bytes = None, buffer_size=BUFFER_SIZE):
+        """
+        Decrypts a file in constant memory with a reusable buffer of `buffer_size` bytes.
+        The output file is removed if the tag does not match.
+        """
+        stream = self.decryptor()
+        if associated_data:
+            stream.update_associated_data(associated_data)
+        try:
+            _stream_file(stream, path_in, path_out, buffer_size, tag)
+        except ValueError:
+            os.remove(path_out)
+            raise
+
+
+class AEADStream:
+    """
+    Incremental AEAD encryption or decryption.
+    When decrypting, the plaintext returned by update() is not authenticated
+    until finalize(tag) succeeds.
+    """
+
+    def __init__(self, cipher, mode: str, decrypt: bool = False):
+        self.cipher = cipher
+        self.mode = mode
+        self.decrypting = decrypt
+        self.tag = None
+        # OCB buffers partial blocks and cannot write into a caller buffer.
+        self.supports_output = mode != "OCB"
+
+    def update_associated_data(self, chunk: bytes):
+        """ Associated data must be given before the message.  """
+        self.cipher.update(chunk)
+        return self
+
+    def update(self, chunk: bytes, output=None):
+        """
+        Processes a chunk of the message.
+        @param output: bytearray or memoryview of len(chunk) bytes receiving the result (EAX, GCM).
+        @return: the processed bytes, or None when `output` is given.
+        """
+        process = self.cipher.decrypt if self.decrypting else self.cipher.encrypt
+        if output is not None and self.supports_output:
+            return process(chunk, output=output)
+        return process(chunk)
+
+    def finalize(self, tag: bytes = None):
+        """
+        Returns the remaining output bytes (only OCB keeps some back).
+        Encryption: the tag is stored in self.tag.
+        Decryption: raises ValueError if `tag` does not match.
+        """
+        tail = b""
+        if self.mode == "OCB":
+            tail = self.cipher.decrypt() if self.decrypting else self.cipher.encrypt()
+
+        if self.decrypting:
+            try:
+                self.cipher.verify(tag)
+            except ValueError:
+                raise ValueError("Key incorrect or message corrupted!")
+            self.tag = tag
+        else:
+            self.tag = self.cipher.digest()
+        return tail
+
+
+def _stream_file(stream, path_in, path_out, buffer_size, tag=None):
+    buffer = bytearray(buffer_size)
+    output = bytearray(buffer_size)
+    view, out_view = memoryview(buffer), memoryview(output)
+
+    with open(path_in, "rb") as f_in, open(path_out, "wb") as f_out:
+        while True:
+            n = f_in.readinto(buffer)
+            if not n:
+                break
+            if stream.supports_output:
+                stream.update(view[:n], output=out_view[:n])
+                f_out.write(out_view[:n])
+            else:
+                f_out.write(stream.update(view[:n]))
+        f_out.write(stream.finalize(tag))
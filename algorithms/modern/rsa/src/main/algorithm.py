@@ -1,12 +1,19 @@
+import os
+import sys
 from Crypto.Util.number import bytes_to_long, long_to_bytes
 from gmpy2 import powmod, invert
 from hashlib import sha256
 
+# Inversion simultanée (astuce de Montgomery) partagée avec l'implémentation ECC
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "ecc", "src"))
+from utils import batch_invert
+
 
 ### Indicatrice d'Euler ou de Carmichael dans ce cas
 phi_n = lambda p, q: (p - 1) * (q - 1)
 inverse_modulo = lambda e, phi: invert(e, phi)
 
+
 ### c = m^e mod n et m = c^d mod n
 encrypt = lambda m, e, n: powmod(m, e, n)
 decrypt = lambda c, d, n: powmod(c, d, n)
@@ -20,7 +27,7 @@ if __name__ == "__main__":
     )
     n = p * q
     e_list = [106979, 108533, 69557, 97117, 103231]
-    d_list = [inverse_modulo(e, phi_n(p, q)) for e in e_list]
+    d_list = batch_invert(e_list, phi_n(p, q))
     print(f"n = {n}\nd = {d_list}")
     
     c = 20304610279578186738172766224224793119885071262464464448863461184092225736054747976985179673905441502689126216282897704508745403799054734121583968853999791604281615154100736259131453424385364324630229671185343778172807262640709301838274824603101692485662726226902121105591137437331463201881264245562214012160875177167442010952439360623396658974413900469093836794752270399520074596329058725874834082188697377597949405779039139194196065364426213208345461407030771089787529200057105746584493554722790592530472869581310117300343461207750821737840042745530876391793484035024644475535353227851321505537398888106855012746117
@@ -1,6 +1,62 @@
-from math import sqrt, ceil
+from math import isqrt
 
-def break_dlp(y, g, p):
+# Largest number of baby steps kept in memory (one dictionary entry each)
+MAX_TABLE = 1 << 20
+# Giant steps between two calls of the progress callback
+PROGRESS_INTERVAL = 1 << 12
+
+
+def baby_step_giant_step(h, g, order, op, power, identity, max_table=MAX_TABLE, progress=None):
+    """
+    Generic Baby-Step Giant-Step: finds an integer `l` such that `h = g^l` in any group
+    given by its operation, so the same code works for Z/pZ* (multiplication mod p)
+    and for elliptic curves (addition of points, `l * P`).
+
+    With m baby steps g^0, ..., g^(m-1) in a table, h * g^(-jm) is looked up for
+    j = 0, 1, ... and `l = jm + i` is found after at most ceil(order / m) giant steps.
+    m = ceil(sqrt(order)) is the usual balance, a smaller `max_table` trades memory
+    for time: the table holds m entries and the search does order / m giant steps.
+
+    Args:
+        h: The target element.
+        g: The base element, its elements must be hashable.
+        order (int): Order of g, or any upper bound of `l` (p - 1 in Z/pZ*).
+        op (callable): Group operation, op(x, y).
+        power (callable): Exponentiation, power(x, k) for any integer k (negative included).
+        identity: Neutral element of the group.
+        max_table (int): Maximum number of baby steps stored.
+        progress (callable): Called as progress(j, steps) during the giant steps.
+
+    Returns:
+        int: The smallest solution `l` in [0, order), or None if h is not a power of g.
+    """
+    m = min(isqrt(order - 1) + 1, max_table) if order > 1 else 1
+
+    # Baby step: g^k for k from 0 to m-1, the first k is kept for each value
+    baby_steps = {}
+    x = identity
+    for k in range(m):
+        if k > 0 and x == identity:
+            # g has order k: the table holds the whole subgroup
+            return baby_steps.get(h)
+        baby_steps.setdefault(x, k)
+        x = op(x, g)
+
+    # Giant step: h * g^(-jm) for j from 0 to ceil(order / m) - 1
+    giant = power(g, -m)
+    steps = -(-order // m)
+    x = h
+    for j in range(steps):
+        i = baby_steps.get(x)
+        if i is not None:
+            return j * m + i
+        if progress is not None and j % PROGRESS_INTERVAL == 0:
+            progress(j, steps)
+        x = op(x, giant)
+    return None
+
+
+def break_dlp(y, g, p, order=None, max_table=MAX_TABLE):
     """
     This function solves the discrete logarithm problem using the Baby-Step Giant-Step algorithm.
     It finds an integer `l` such that `y = g^l mod p`.
@@ -9,44 +65,55 @@ def break_dlp(y, g, p):
         y (int): The result of the discrete logarithm (the target value).
         g (int): The base of the discrete logarithm.
         p (int): The modulus for the discrete logarithm.
+        order (int): Order of g if known, p - 1 by default.
+        max_table (int): Maximum number of baby steps stored.
 
     Returns:
-        int: The solution `l` to the equation `y = g^l mod p`.
+        int: The solution `l` to the equation `y = g^l mod p`, or None if there is none.
     """
-    # Calculate the square root of p and round up to the nearest integer
-    m = ceil(sqrt(p))
-    
-    # Baby step: store all values of g^k mod p for k from 0 to m-1
-    baby_steps = {pow(g, k, p): k for k in range(m)}
-    print("Baby Steps: ", baby_steps)
-
-    x = y
-    j = 0
-    # Calculate the inverse of g^m mod p
-    inv_g_pow_m = pow(g, -m, p)
-    print(f"Inverse modulo of g^m: {inv_g_pow_m}")
-
-    all_x = [x]
-    
-    # Giant step: compute x * g^(-m) mod p iteratively
-    while x not in baby_steps.keys():
-        x = pow(x * inv_g_pow_m, 1, p)
-        all_x.append(x)
-        j += 1
-
-    print("Giant Steps: ", all_x)
-
-    # Calculate the solution to the discrete logarithm problem
-    l = j * m + baby_steps[x]
-    print(f"{g}^{l} = {pow(g, l, p)}[{p}]\n")
-    return l
+    return baby_step_giant_step(
+        y % p,
+        g % p,
+        p - 1 if order is None else order,
+        lambda a, b: a * b % p,
+        lambda a, k: pow(a, k, p),
+        1,
+        max_table,
+    )
 
 
 if __name__ == "__main__":
-    p = 101  
-    m = ceil(sqrt(p)) 
-    g = 2  
-    y = 48  
-    
+    p = 101
+    g = 2
+    y = 48
+
     # Perform the attack and get the solution l
     l = break_dlp(y, g, p)
+    print(f"{g}^{l} = {pow(g, l, p)}[{p}]")
+
+    # Same answer with a table of 4 entries instead of 11
+    assert break_dlp(y, g, p, max_table=4) == l
+
+    # 3 is not a power of 5 mod 101 (5 has order 25)
+    print(f"log_5(3) mod {p}: {break_dlp(3, 5, p)}")
+
+    # Additive group Z/nZ: l * g = h mod n
+    n = 1000003
+    print(f"log(5) in Z/{n}Z: {baby_step_giant_step(5, 7, n, lambda a, b: (a + b) % n, lambda a, k: a * k % n, 0)}")
+
+    # Elliptic curve points (algorithms/modern/ecc): Q = l * P
+    import os
+    import sys
+    from operator import add
+    from random import randrange
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "algorithms", "modern", "ecc", "src"))
+    from weierstrass import Curve
+
+    curve = Curve(-3, 1, 1000003)
+    n, P = curve.get_prime_order()
+    l = randrange(n)
+    Q = l * P
+    assert baby_step_giant_step(Q, P, n, add, lambda X, k: k * X, curve.infinity) == l
+    assert baby_step_giant_step(Q, P, n, add, lambda X, k: k * X, curve.infinity, max_table=64) == l
+    print(f"log_P(Q) = {l} for P = {P}, Q = {Q} of order {n} on y^2 = x^3 - 3x + 1 [{curve.p}]")